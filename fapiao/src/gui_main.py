@@ -1,5 +1,4 @@
 import os
-import time
 import pandas as pd
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
@@ -7,10 +6,10 @@ from datetime import datetime
 from loguru import logger as log
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.common import TimeoutException
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service as ChromeService
+from element_wait import ElementWait
+from pages import ContractPage, InvoiceDialog
+from log_view import LogView
 import threading  # 新增线程支持
 
 # 日志配置
@@ -22,6 +21,8 @@ log.add(
     encoding="utf-8"
 )
 
+INVOICE_DIALOG_TITLE = "发票申请"
+
 class InvoiceApp:
     def __init__(self, root):
         self.root = root
@@ -34,6 +35,9 @@ class InvoiceApp:
         self.error_file = os.path.join(os.path.expanduser("~"), "Desktop", "error_records.xlsx")
         self.all_data = []
         self.driver = None
+        self.wait = None
+        self.contract_page = None
+        self.invoice_dialog = None
         self.is_running = False
         
         # 创建界面
@@ -97,30 +101,9 @@ class InvoiceApp:
         log_frame = ttk.LabelFrame(log_tab, text="运行日志")
         log_frame.pack(padx=10, pady=10, fill="both", expand=True)
         
-        self.log_text = tk.Text(log_frame, wrap="word", state="disabled")
-        self.log_text.pack(padx=5, pady=5, fill="both", expand=True, side="left")
-        
-        scrollbar = ttk.Scrollbar(log_frame, command=self.log_text.yview)
-        scrollbar.pack(side="right", fill="y")
-        self.log_text.config(yscrollcommand=scrollbar.set)
-        
-        # 重定向日志到文本框
-        import logging
-        class TextHandler(logging.Handler):
-            def __init__(self, text_widget):
-                logging.Handler.__init__(self)
-                self.text_widget = text_widget
-                
-            def emit(self, record):
-                msg = self.format(record) + "\n"
-                self.text_widget.configure(state="normal")
-                self.text_widget.insert("end", msg)
-                self.text_widget.see("end")
-                self.text_widget.configure(state="disabled")
-        
-        text_handler = TextHandler(self.log_text)
-        text_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-        log.add(text_handler)
+        # 日志经缓冲区批量刷新到文本框，处理线程不直接操作界面控件
+        self.log_view = LogView(log_frame, log).attach()
+        self.log_view.pack(fill="both", expand=True)
     
     def browse_excel(self):
         filename = filedialog.askopenfilename(
@@ -181,6 +164,9 @@ class InvoiceApp:
             # options.add_argument("--headless=new")
             driver = webdriver.Chrome(service=service, options=options)
             driver.maximize_window()
+            self.wait = ElementWait(driver)
+            self.contract_page = ContractPage(driver)
+            self.invoice_dialog = InvoiceDialog(driver, INVOICE_DIALOG_TITLE)
             log.info("Chrome浏览器已启动并最大化窗口")
             
             driver.get(os.getenv("CRM_URL") or "")
@@ -197,9 +183,7 @@ class InvoiceApp:
                 return False
             log.info("开始执行登录操作...")
             # 输入用户名和密码
-            username_input = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, 'input[placeholder="账号"]'))
-            )
+            username_input = self.wait.present((By.CSS_SELECTOR, 'input[placeholder="账号"]'))
             log.info("找到用户名输入框")
             password_input = self.driver.find_element(By.CSS_SELECTOR, 'input[placeholder="密码"]')
             log.info("找到密码输入框")
@@ -210,14 +194,16 @@ class InvoiceApp:
             log.info("已输入密码")
 
             # 点击登录按钮
-            login_button = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CLASS_NAME, 'login-submit'))
-            )
+            login_button = self.wait.clickable((By.CLASS_NAME, 'login-submit'))
             log.info("找到登录按钮")
             login_button.click()
             log.info("已点击登录按钮，等待登录完成...")
 
-            time.sleep(2)
+            # 登录成功后账号输入框随登录页一起卸载
+            self.wait.until(
+                lambda driver: not driver.find_elements(By.CSS_SELECTOR, 'input[placeholder="账号"]'),
+                message="登录页未跳转"
+            )
             log.success("登录成功")
             return True
         except Exception as e:
@@ -232,13 +218,12 @@ class InvoiceApp:
             log.info("开始导航至待开班合同表页面...")
             target_url = os.getenv("HETONG_URL") or ""
             self.driver.get(target_url)
+            self.contract_page.invalidate()
             log.info(f"已直接访问待开班合同表页面：{target_url}")
             
-            WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located((By.XPATH, '//div[contains(@class, "el-table")]'))
-            )
+            self.wait.present((By.XPATH, '//div[contains(@class, "el-table")]'), 15)
+            self.wait.loading_finished(15)
             log.info("待开班合同表页面加载完成")
-            time.sleep(1)
             return True
         except Exception as e:
             log.error(f"直接访问待开班合同表失败：{e}")
@@ -252,32 +237,17 @@ class InvoiceApp:
             
             log.info(f"开始搜索合同编号: {target_contract_no}")
 
-            contract_no_form = WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located(
-                    (By.XPATH, '//div[@class="el-form-item el-form-item--small"][label[@class="el-form-item__label" and text()="合同编号"]]')
-                )
-            )
-            contract_no_input = contract_no_form.find_element(
-                By.XPATH, './/input[@class="el-input__inner" and @placeholder="请输入"]'
-            )
-            contract_no_input.click()
-            contract_no_input.clear()
-            contract_no_input.send_keys(target_contract_no)
+            # 先记下表格当前状态，只接受点击搜索之后刷新出的结果
+            self.wait.watch_table_refresh()
+            # 合同编号输入框和搜索按钮在记录之间不变，由页面对象缓存句柄
+            self.contract_page.search(target_contract_no)
             log.info(f"已输入合同编号：{target_contract_no}")
-
-            search_btn = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable(
-                    (By.XPATH, '//button[contains(@class, "submit-btn") and span[text()=" 搜索 "]]')
-                )
-            )
-            self.driver.execute_script("arguments[0].click();", search_btn)
             log.info("已点击搜索按钮，等待搜索结果...")
-            time.sleep(2)
 
             try:
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.XPATH, '//div[@class="el-table__fixed-body-wrapper"]//tbody'))
-                )
+                if self.wait.search_settled(target_contract_no) == "empty":
+                    log.warning(f"合同编号 {target_contract_no} 搜索结果为空")
+                    return False
                 rows = self.driver.find_elements(By.XPATH, '//div[@class="el-table__fixed-body-wrapper"]//tbody/tr')
                 if len(rows) == 0 or (len(rows) == 1 and "暂无数据" in rows[0].text):
                     log.warning(f"合同编号 {target_contract_no} 搜索结果为空")
@@ -297,10 +267,9 @@ class InvoiceApp:
                 log.error("浏览器驱动未初始化，请先调用init_driver()")
                 return False
             log.info("开始执行申请发票操作...")
-            fixed_table_rows = WebDriverWait(self.driver, 15).until(
-                EC.presence_of_all_elements_located(
-                    (By.XPATH, '//div[@class="el-table__fixed"]//div[@class="el-table__fixed-body-wrapper"]//tbody/tr')
-                )
+            fixed_table_rows = self.wait.all_present(
+                (By.XPATH, '//div[@class="el-table__fixed"]//div[@class="el-table__fixed-body-wrapper"]//tbody/tr'),
+                15
             )
 
             target_row_index = 0
@@ -312,7 +281,6 @@ class InvoiceApp:
             )
 
             self.driver.execute_script("arguments[0].scrollIntoView(true);", target_checkbox)
-            time.sleep(0.5)
 
             class_attr = target_checkbox.get_attribute("class")
             if class_attr is None or "is-checked" not in class_attr:
@@ -320,39 +288,23 @@ class InvoiceApp:
                     target_checkbox.click()
                 except:
                     self.driver.execute_script("arguments[0].click();", target_checkbox)
-                time.sleep(0.5)
 
-            if "is-checked" in (target_checkbox.get_attribute("class") or ""):
+            try:
+                self.wait.until(lambda _: "is-checked" in (target_checkbox.get_attribute("class") or ""), 3)
                 log.info("✅ 固定列复选框已成功勾选")
-            else:
+            except Exception:
                 raise Exception("❌ 勾选失败，复选框仍未选中")
                 
-            apply_btn = WebDriverWait(self.driver, 15).until(
-                EC.element_to_be_clickable(
-                    (By.XPATH,
-                     '//div[@class="table-tools-btnList"]//button[contains(@class, "table-tools-btn") and span[text()=" 申请发票 "]]')
-                )
-            )
             log.info("开始点击「申请发票」按钮...")
-            self.driver.execute_script("arguments[0].scrollIntoView(true);", apply_btn)
-            time.sleep(0.5)
-            self.driver.execute_script("arguments[0].click();", apply_btn)
+            self.wait.clear_messages()
+            self.contract_page.click_apply()
             log.info("已点击「申请发票」按钮")
-            time.sleep(1)
-            
-            try:
-                message = WebDriverWait(self.driver, 3).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "div.el-message"))
-                )
-                msg_text = message.find_element(By.CLASS_NAME, "el-message__content").text.strip()
-                class_attr = message.get_attribute("class") or ""
-                if "el-message--warning" in class_attr or "el-message--error" in class_attr:
-                    log.warning(f"提交被拦截：{msg_text}")
-                    return False
-                else:
-                    log.info(f"提示信息：{msg_text}")
-            except TimeoutException:
-                log.info("未检测到任何提示，继续流程")
+
+            kind, payload = self.wait.dialog_or_message(INVOICE_DIALOG_TITLE)
+            if kind == "message":
+                log.warning(f"提交被拦截：{payload['text']}")
+                return False
+            log.info("「发票申请」对话框已打开")
             return True
         except Exception as e:
             log.error(f"点击「申请发票」按钮失败：{e}")
@@ -364,20 +316,9 @@ class InvoiceApp:
                 log.error("浏览器驱动未初始化，请先调用init_driver()")
                 return False
             log.info("开始选择发票类型...")
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "el-dialog__title"))
-            )
-            invoice_group_select = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "label[for='invoiceGroup'] + div .el-select"))
-            )
-            invoice_group_select.click()
-            log.info("已打开发票类型下拉框")
-
-            WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH, "//li[contains(@class, 'el-select-dropdown__item')]/span[text()='增值税普通发票']"))
-            ).click()
+            self.wait.dialog_open(INVOICE_DIALOG_TITLE)
+            self.invoice_dialog.select("invoiceGroup", "增值税普通发票")
             log.info("已选择发票类型：增值税普通发票")
-            time.sleep(0.5)
             return True
         except Exception as e:
             log.error(f"选择发票类型失败：{e}")
@@ -389,17 +330,8 @@ class InvoiceApp:
                 log.error("浏览器驱动未初始化，请先调用init_driver()")
                 return False
             log.info("开始选择发票抬头...")
-            invoice_type_select = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "label[for='invoiceType'] + div .el-select"))
-            )
-            invoice_type_select.click()
-            log.info("已打开发票抬头下拉框")
-
-            WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH, "//li[contains(@class, 'el-select-dropdown__item')]/span[text()='电子票']"))
-            ).click()
+            self.invoice_dialog.select("invoiceType", "电子票")
             log.info("已选择发票抬头：电子票")
-            time.sleep(0.5)
             return True
         except Exception as e:
             log.error(f"选择发票抬头失败：{e}")
@@ -411,17 +343,8 @@ class InvoiceApp:
                 log.error("浏览器驱动未初始化，请先调用init_driver()")
                 return False
             log.info("开始选择抬头类型...")
-            title_type_select = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "label[for='invoiceUpHeadType'] + div .el-select"))
-            )
-            title_type_select.click()
-            log.info("已打开抬头类型下拉框")
-
-            WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH, "//li[contains(@class, 'el-select-dropdown__item')]/span[text()='个人']"))
-            ).click()
+            self.invoice_dialog.select("invoiceUpHeadType", "个人")
             log.info("已选择抬头类型：个人")
-            time.sleep(0.5)
             return True
         except Exception as e:
             log.error(f"选择抬头类型失败：{e}")
@@ -433,13 +356,8 @@ class InvoiceApp:
                 log.error("浏览器驱动未初始化，请先调用init_driver()")
                 return False
             log.info("开始填写发票抬头...")
-            invoice_title_input = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "label[for='invoiceUpHead'] + div .el-input__inner"))
-            )
-            invoice_title_input.clear()
-            invoice_title_input.send_keys("个人")
+            self.invoice_dialog.fill("invoiceUpHead", "个人")
             log.info("已填写发票抬头：个人")
-            time.sleep(0.5)
             return True
         except Exception as e:
             log.error(f"填写发票抬头失败：{e}")
@@ -451,18 +369,8 @@ class InvoiceApp:
                 log.error("浏览器驱动未初始化，请先调用init_driver()")
                 return False
             log.info(f"开始填写发票内容：{content}")
-            invoice_content_select = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "label[for='invoiceContext'] + div .el-select"))
-            )
-            invoice_content_select.click()
-            log.info("已打开发票内容下拉框")
-
-            WebDriverWait(self.driver, 10).until(
-            EC.element_to_be_clickable(
-                (By.XPATH, f"//li[contains(@class, 'el-select-dropdown__item')]/span[text()='{content}']"))
-                ).click()
+            self.invoice_dialog.select("invoiceContext", content)
             log.info(f"已选择发票内容：{content}")
-            time.sleep(0.5)
             return True
         except Exception as e:
             log.error(f"填写发票内容失败：{e}")
@@ -474,13 +382,8 @@ class InvoiceApp:
                 log.error("浏览器驱动未初始化，请先调用init_driver()")
                 return False
             log.info(f"开始填写发票金额：{amount}")
-            invoice_amount_input = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "label[for='billMoney'] + div .el-input__inner"))
-                )
-            invoice_amount_input.clear()
-            invoice_amount_input.send_keys(amount)
+            self.invoice_dialog.fill("billMoney", amount)
             log.info(f"已填写发票金额：{amount}")
-            time.sleep(0.5)
             return True
         except Exception as e:
             log.error(f"填写发票金额失败：{e}")
@@ -492,13 +395,8 @@ class InvoiceApp:
                 log.error("浏览器驱动未初始化，请先调用init_driver()")
                 return False
             log.info(f"开始填写接收邮箱：{email}")
-            email_input = WebDriverWait(self.driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "label[for='invoiceEmail'] + div .el-input__inner"))
-            )
-            email_input.clear()
-            email_input.send_keys(email)
+            self.invoice_dialog.fill("invoiceEmail", email)
             log.info(f"已填写接收邮箱：{email}")
-            time.sleep(0.5)
             return True
         except Exception as e:
             log.error(f"填写接收邮箱失败：{e}")
@@ -512,12 +410,15 @@ class InvoiceApp:
             log.info("开始提交发票申请...")
             
             # 点击提交按钮
-            ok_btn = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH,
-                 '//div[@aria-label="发票申请"]//div[@class="el-dialog__footer"]//button[contains(@class,"el-button--primary")]')))
-            self.driver.execute_script("arguments[0].click();", ok_btn)
+            self.wait.clear_messages()
+            self.invoice_dialog.submit()
             log.info("已点击提交按钮")
-            time.sleep(2)
+
+            kind, payload = self.wait.closed_or_message(INVOICE_DIALOG_TITLE)
+            if kind == "message":
+                log.warning(f"提交被拦截：{payload['text']}")
+                return False
+            self.wait.loading_finished()
             return True
         except Exception as e:
             log.error(f"提交发票申请失败：{e}")
@@ -646,7 +547,6 @@ class InvoiceApp:
                     continue
                 
                 log.success(f"合同 {contract_no} 处理成功")
-                time.sleep(2)  # 处理间隔
                 
             # 保存错误记录
             if error_records:
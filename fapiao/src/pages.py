@@ -0,0 +1,231 @@
+import unicodedata
+
+from selenium.common import StaleElementReferenceException
+from selenium.webdriver.common.by import By
+
+from element_wait import ElementWait
+
+# 合同页面在处理记录之间不会重新渲染，以下元素定位一次后即可复用
+CONTRACT_NO_INPUT = (
+    By.XPATH,
+    '//div[@class="el-form-item el-form-item--small"][label[@class="el-form-item__label" and text()="合同编号"]]'
+    '//input[@class="el-input__inner" and @placeholder="请输入"]',
+)
+SEARCH_BUTTON = (
+    By.XPATH,
+    '//button[contains(@class, "submit-btn") and span[text()=" 搜索 "]]',
+)
+APPLY_BUTTON = (
+    By.XPATH,
+    '//div[@class="table-tools-btnList"]//button[contains(@class, "table-tools-btn") and span[text()=" 申请发票 "]]',
+)
+
+_JS_CLICK = "arguments[0].click();"
+_JS_SCROLL_CLICK = "arguments[0].scrollIntoView(true); arguments[0].click();"
+
+# 在对话框标题栏上模拟一次鼠标按下/抬起，触发 Element UI 的 clickoutside 收起下拉框（不会关闭对话框）
+_JS_DISMISS_DROPDOWNS = """
+var header = document.querySelector('div.el-dialog[aria-label="' + arguments[0] + '"] .el-dialog__header');
+if (!header) return;
+['mousedown', 'mouseup'].forEach(function (type) {
+    header.dispatchEvent(new MouseEvent(type, {bubbles: true}));
+});
+"""
+
+# 一次往返读取弹出层中全部选项的文本
+_JS_DROPDOWN_OPTIONS = """
+return Array.prototype.map.call(
+    arguments[0].querySelectorAll('li.el-select-dropdown__item'),
+    function (item) { return item.textContent; }
+);
+"""
+
+# 按位置点击选项，返回被点击选项的文本用于核对
+_JS_CLICK_OPTION = """
+var item = arguments[0].querySelectorAll('li.el-select-dropdown__item')[arguments[1]];
+if (!item) return null;
+item.click();
+return item.textContent;
+"""
+
+
+def normalize_option(text):
+    """选项文本归一化：全角字符转半角（NFKC）、连续空白合并为一个空格、去掉首尾空白"""
+    return " ".join(unicodedata.normalize("NFKC", "" if text is None else str(text)).split())
+
+
+class OptionNotFound(Exception):
+    """下拉框中没有指定文本的选项：立即失败，不等待超时也不重试"""
+
+
+class CachedElement:
+    """首次使用时定位并缓存的元素句柄，只有抛出 StaleElementReferenceException 时才重新定位"""
+
+    def __init__(self, wait, locator, timeout=None, clickable=False):
+        self.wait = wait
+        self.locator = locator
+        self.timeout = timeout
+        self.clickable = clickable
+        self._element = None
+
+    def get(self):
+        if self._element is None:
+            if self.clickable:
+                self._element = self.wait.clickable(self.locator, self.timeout)
+            else:
+                self._element = self.wait.present(self.locator, self.timeout)
+        return self._element
+
+    def invalidate(self):
+        self._element = None
+
+    def run(self, action):
+        """对元素执行操作；句柄已失效（页面重新渲染）时重新定位后再执行一次"""
+        try:
+            return action(self.get())
+        except StaleElementReferenceException:
+            self._element = None
+            return action(self.get())
+
+
+class BasePage:
+    """页面对象基类，按定位器缓存元素句柄"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.wait = ElementWait(driver)
+        self._handles = {}
+
+    def handle(self, locator, timeout=None, clickable=False) -> CachedElement:
+        if locator not in self._handles:
+            self._handles[locator] = CachedElement(self.wait, locator, timeout, clickable)
+        return self._handles[locator]
+
+    def invalidate(self):
+        """整页跳转后调用，所有句柄在下次使用时重新定位"""
+        for handle in self._handles.values():
+            handle.invalidate()
+
+    def click(self, handle):
+        handle.run(lambda element: self.driver.execute_script(_JS_CLICK, element))
+
+    def type(self, handle, text):
+        def _type(element):
+            element.clear()
+            element.send_keys(text)
+
+        handle.run(_type)
+
+
+class ContractPage(BasePage):
+    """待开班合同表页面"""
+
+    def __init__(self, driver):
+        super().__init__(driver)
+        self.contract_input = self.handle(CONTRACT_NO_INPUT, 15)
+        self.search_button = self.handle(SEARCH_BUTTON, clickable=True)
+        self.apply_button = self.handle(APPLY_BUTTON, 15, clickable=True)
+
+    def search(self, contract_no):
+        """输入合同编号并点击搜索"""
+        self.type(self.contract_input, contract_no)
+        self.click(self.search_button)
+
+    def click_apply(self):
+        """滚动到「申请发票」按钮并点击"""
+        self.apply_button.run(
+            lambda element: self.driver.execute_script(_JS_SCROLL_CLICK, element)
+        )
+
+
+class InvoiceDialog(BasePage):
+    """「发票申请」对话框，表单项按 label[for=字段名] 定位"""
+
+    def __init__(self, driver, title, option_timeout=3):
+        super().__init__(driver)
+        self.title = title
+        self.option_timeout = option_timeout
+        # 下拉框选项索引：字段名 → {归一化文本: 位置}，每个浏览器会话读取一次
+        self._options = {}
+        self.submit_button = self.handle(
+            (
+                By.XPATH,
+                f'//div[@aria-label="{title}"]//div[@class="el-dialog__footer"]//button[contains(@class,"el-button--primary")]',
+            ),
+            clickable=True,
+        )
+
+    def field(self, prop, kind="input"):
+        """表单项的控件句柄：kind 为 select 时返回下拉框，否则返回输入框"""
+        selector = ".el-select" if kind == "select" else ".el-input__inner"
+        return self.handle(
+            (By.CSS_SELECTOR, f"label[for='{prop}'] + div {selector}"), clickable=True
+        )
+
+    def select(self, prop, text):
+        """打开下拉框并按位置点击指定文本的选项
+
+        选项列表首次使用时读取并缓存；没有该选项时立即抛出 OptionNotFound。
+
+        Raises:
+            OptionNotFound: 下拉框中没有该选项
+        """
+        self.field(prop, "select").run(lambda element: element.click())
+        popper = self.wait.dropdown_visible()
+        key = normalize_option(text)
+        index = self._options.get(prop)
+        if index is None or key not in index:
+            # 缓存中没有时重新读取一次，选项可能在上次读取之后才加载完整
+            index = self._read_options(prop, popper)
+        if key not in index:
+            self.dismiss_dropdowns()
+            raise OptionNotFound(f"下拉框「{prop}」中没有选项「{text}」")
+
+        clicked = self.driver.execute_script(_JS_CLICK_OPTION, popper, index[key])
+        if clicked is None or normalize_option(clicked) != key:
+            # 选项列表已变化：清除缓存，按页面元素失效交给重试
+            self._options.pop(prop, None)
+            raise StaleElementReferenceException(f"下拉框「{prop}」的选项列表已变化")
+        self.wait.dropdown_hidden()
+
+    def option_labels(self, prop):
+        """已读取的下拉框选项文本（归一化后），未读取时返回None"""
+        index = self._options.get(prop)
+        return list(index) if index is not None else None
+
+    def _read_options(self, prop, popper):
+        """读取弹出层中的选项并建立索引；选项异步加载时最多等待 option_timeout 秒"""
+        labels = self.wait.until(
+            lambda driver: driver.execute_script(_JS_DROPDOWN_OPTIONS, popper) or None,
+            self.option_timeout,
+            f"下拉框「{prop}」没有选项",
+        )
+        index = {}
+        for position, label in enumerate(labels):
+            index.setdefault(normalize_option(label), position)
+        self._options[prop] = index
+        return index
+
+    def fill(self, prop, value):
+        self.type(self.field(prop), value)
+
+    def dismiss_dropdowns(self):
+        """收起展开的下拉框，用于重试某一项之前恢复状态"""
+        self.driver.execute_script(_JS_DISMISS_DROPDOWNS, self.title)
+        try:
+            self.wait.dropdown_hidden(2)
+        except Exception:
+            pass
+
+    def submit(self):
+        self.click(self.submit_button)
+
+    def close(self):
+        """点击右上角关闭按钮（失败后的清理路径，不缓存）"""
+        close_buttons = self.driver.find_elements(
+            By.CSS_SELECTOR, f'div.el-dialog[aria-label="{self.title}"] .el-dialog__headerbtn'
+        )
+        if close_buttons:
+            self.driver.execute_script(_JS_CLICK, close_buttons[0])
+            return True
+        return False
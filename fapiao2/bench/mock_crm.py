@@ -0,0 +1,433 @@
+"""本地模拟CRM：登录页、待开班合同表（Element UI 表格结构）和「发票申请」对话框
+
+页面只还原自动化流程依赖的DOM结构和交互，接口延迟可配置，用于在不访问生产CRM的情况下测量吞吐量。
+"""
+
+import json
+import random
+import secrets
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+INVOICE_CONTENTS = ("培训费", "咨询服务费", "技术服务费", "资料费")
+
+_STYLE = """
+<style>
+body { font-family: sans-serif; margin: 0; }
+.el-loading-mask { position: fixed; top: 0; right: 0; bottom: 0; left: 0; background: rgba(255,255,255,.6); z-index: 2500; }
+.el-dialog__wrapper { position: fixed; top: 0; right: 0; bottom: 0; left: 0; background: rgba(0,0,0,.3); z-index: 2000; overflow: auto; }
+.el-dialog { background: #fff; margin: 40px auto; width: 640px; padding: 12px; }
+.el-select-dropdown { position: absolute; background: #fff; border: 1px solid #ddd; z-index: 3000; min-width: 200px; }
+.el-select-dropdown__item { padding: 4px 12px; cursor: pointer; list-style: none; }
+.el-message { position: fixed; top: 10px; left: 40%; padding: 8px 16px; background: #eee; z-index: 4000; }
+.el-form-item { margin: 6px 0; }
+.el-checkbox__input { display: inline-block; width: 14px; height: 14px; border: 1px solid #999; }
+.el-checkbox__input.is-checked { background: #409eff; }
+td, th { border: 1px solid #eee; padding: 4px 8px; height: 24px; }
+</style>
+"""
+
+LOGIN_PAGE = (
+    """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>CRM登录</title>"""
+    + _STYLE
+    + """</head><body>
+<div class="login-form">
+  <div class="el-input"><input class="el-input__inner" placeholder="账号" id="username"></div>
+  <div class="el-input"><input class="el-input__inner" type="password" placeholder="密码" id="password"></div>
+  <button type="button" class="el-button login-submit" id="login"><span>登 录</span></button>
+</div>
+<script>
+document.getElementById('login').addEventListener('click', function () {
+  fetch('/api/login', {
+    method: 'POST',
+    headers: {'Content-Type': 'application/json'},
+    body: JSON.stringify({
+      username: document.getElementById('username').value,
+      password: document.getElementById('password').value
+    })
+  }).then(function (r) { return r.json(); }).then(function (body) {
+    if (body.code === 200) {
+      localStorage.setItem('token', body.data.token);
+      location.href = '/home';
+    }
+  });
+});
+</script>
+</body></html>
+"""
+)
+
+HOME_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>CRM首页</title></head>
+<body><div class="home">已登录</div></body></html>
+"""
+
+CONTRACT_PAGE = (
+    """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>待开班合同表</title>"""
+    + _STYLE
+    + """</head><body>
+<form class="el-form" onsubmit="return false">
+  <div class="el-form-item el-form-item--small"><label class="el-form-item__label">合同编号</label><div class="el-form-item__content"><div class="el-input"><input class="el-input__inner" placeholder="请输入" id="keyword"></div></div></div>
+  <button type="button" class="el-button submit-btn" id="search"><span> 搜索 </span></button>
+</form>
+<div class="table-tools-btnList"><button type="button" class="el-button table-tools-btn" id="apply"><span> 申请发票 </span></button></div>
+<div class="el-table">
+  <div class="el-table__header-wrapper"><table><thead><tr><th>合同编号</th><th>客户名称</th><th>合同金额</th></tr></thead></table></div>
+  <div class="el-table__body-wrapper"><table><tbody id="body"></tbody></table><div class="el-table__empty-block" id="empty" style="display: none"><span class="el-table__empty-text">暂无数据</span></div></div>
+  <div class="el-table__fixed"><div class="el-table__fixed-body-wrapper"><table><tbody id="fixed"></tbody></table></div></div>
+</div>
+<div class="el-pagination"><button type="button" class="btn-next" id="next">下一页</button></div>
+<div class="el-loading-mask" id="mask" style="display: none"></div>
+<div class="el-dialog__wrapper" id="dialog" style="display: none">
+  <div class="el-dialog" aria-label="发票申请" role="dialog">
+    <div class="el-dialog__header"><span class="el-dialog__title">发票申请</span><button type="button" class="el-dialog__headerbtn" id="close">×</button></div>
+    <div class="el-dialog__body"><form class="el-form" id="invoice-form" onsubmit="return false"></form></div>
+    <div class="el-dialog__footer"><button type="button" class="el-button el-button--default" id="cancel"><span>取 消</span></button><button type="button" class="el-button el-button--primary" id="ok"><span>确 定</span></button></div>
+  </div>
+</div>
+<script>
+var CONFIG = __CONFIG__;
+var PAGE_SIZE = 20;
+var state = {keyword: '', page: 1, total: 0, rows: []};
+var model = {};
+var controls = {};
+
+function el(tag, cls) { var e = document.createElement(tag); if (cls) e.className = cls; return e; }
+function $(id) { return document.getElementById(id); }
+function setLoading(on) { $('mask').style.display = on ? 'block' : 'none'; }
+
+function message(type, text) {
+  var box = el('div', 'el-message el-message--' + type);
+  var content = el('p', 'el-message__content');
+  content.textContent = text;
+  box.appendChild(content);
+  document.body.appendChild(box);
+  setTimeout(function () { box.remove(); }, 3000);
+}
+
+function api(path, payload) {
+  return fetch(path, {
+    method: 'POST',
+    headers: {'Content-Type': 'application/json', 'token': localStorage.getItem('token') || ''},
+    body: JSON.stringify(payload)
+  }).then(function (r) { return r.json(); });
+}
+
+function render() {
+  var body = $('body'), fixed = $('fixed');
+  body.innerHTML = '';
+  fixed.innerHTML = '';
+  state.rows.forEach(function (row) {
+    var tr = el('tr');
+    [row.contractNo, row.customerName, row.amount].forEach(function (text) {
+      var td = el('td'); td.textContent = text; tr.appendChild(td);
+    });
+    body.appendChild(tr);
+    var ftr = el('tr'), ftd = el('td'), label = el('label', 'el-checkbox'), box = el('span', 'el-checkbox__input');
+    box.appendChild(el('span', 'el-checkbox__inner'));
+    box.addEventListener('click', function () { box.classList.toggle('is-checked'); });
+    label.appendChild(box); ftd.appendChild(label); ftr.appendChild(ftd); fixed.appendChild(ftr);
+  });
+  $('empty').style.display = state.rows.length ? 'none' : 'block';
+  var last = state.page * PAGE_SIZE >= state.total;
+  $('next').disabled = last;
+  $('next').classList.toggle('disabled', last);
+}
+
+function load() {
+  setLoading(true);
+  api(CONFIG.searchPath, {contractNo: state.keyword, pageNum: state.page, pageSize: PAGE_SIZE}).then(function (body) {
+    state.rows = body.data.records;
+    state.total = body.data.total;
+    render();
+    setLoading(false);
+  });
+}
+
+$('search').addEventListener('click', function () {
+  state.keyword = $('keyword').value.trim();
+  state.page = 1;
+  load();
+});
+$('next').addEventListener('click', function () {
+  if ($('next').disabled) return;
+  state.page += 1;
+  load();
+});
+
+var FIELDS = [
+  {prop: 'invoiceGroup', label: '发票类型', options: ['增值税普通发票', '增值税专用发票']},
+  {prop: 'invoiceType', label: '发票形式', options: ['电子票', '纸质票']},
+  {prop: 'invoiceUpHeadType', label: '抬头类型', options: ['个人', '企业']},
+  {prop: 'invoiceUpHead', label: '发票抬头'},
+  {prop: 'invoiceContext', label: '发票内容', options: CONFIG.contents},
+  {prop: 'billMoney', label: '开票金额'},
+  {prop: 'invoiceEmail', label: '接收邮箱'}
+];
+
+function closeDropdowns() {
+  document.querySelectorAll('.el-select-dropdown').forEach(function (d) { d.style.display = 'none'; });
+}
+
+document.addEventListener('mousedown', function (e) {
+  if (!e.target.closest('.el-select') && !e.target.closest('.el-select-dropdown')) closeDropdowns();
+});
+
+function buildSelect(field, content) {
+  var select = el('div', 'el-select'), wrap = el('div', 'el-input el-input--suffix'), input = el('input', 'el-input__inner');
+  input.readOnly = true;
+  input.placeholder = '请选择';
+  wrap.appendChild(input); select.appendChild(wrap); content.appendChild(select);
+  var dropdown = el('div', 'el-select-dropdown el-popper'), list = el('ul', 'el-select-dropdown__list');
+  dropdown.style.display = 'none';
+  var component = {options: [], selectedLabel: '', value: '', $el: select};
+  component.handleOptionClick = function (option) {
+    component.value = option.value;
+    component.selectedLabel = option.currentLabel;
+    input.value = option.currentLabel;
+    model[field.prop] = option.value;
+    dropdown.style.display = 'none';
+  };
+  component.reset = function () { component.value = ''; component.selectedLabel = ''; input.value = ''; };
+  field.options.forEach(function (text) {
+    var option = {value: text, label: text, currentLabel: text};
+    var item = el('li', 'el-select-dropdown__item'), span = el('span');
+    span.textContent = text;
+    item.appendChild(span); list.appendChild(item);
+    item.addEventListener('click', function () { component.handleOptionClick(option); });
+    component.options.push(option);
+  });
+  dropdown.appendChild(list);
+  document.body.appendChild(dropdown);
+  select.addEventListener('click', function () {
+    var rect = select.getBoundingClientRect();
+    closeDropdowns();
+    dropdown.style.left = rect.left + 'px';
+    dropdown.style.top = (rect.bottom + window.scrollY) + 'px';
+    setTimeout(function () { dropdown.style.display = 'block'; }, CONFIG.dropdownDelay);
+  });
+  if (CONFIG.vue) select.__vue__ = component;
+  return component;
+}
+
+function buildInput(field, content) {
+  var wrap = el('div', 'el-input'), input = el('input', 'el-input__inner');
+  wrap.appendChild(input); content.appendChild(wrap);
+  input.addEventListener('input', function () { model[field.prop] = input.value; });
+  return {reset: function () { input.value = ''; }};
+}
+
+FIELDS.forEach(function (field) {
+  var item = el('div', 'el-form-item'), label = el('label', 'el-form-item__label'), content = el('div', 'el-form-item__content');
+  label.setAttribute('for', field.prop);
+  label.textContent = field.label;
+  item.appendChild(label); item.appendChild(content);
+  $('invoice-form').appendChild(item);
+  controls[field.prop] = field.options ? buildSelect(field, content) : buildInput(field, content);
+});
+
+function closeDialog() { closeDropdowns(); $('dialog').style.display = 'none'; }
+$('close').addEventListener('click', closeDialog);
+$('cancel').addEventListener('click', closeDialog);
+
+$('apply').addEventListener('click', function () {
+  var checked = [];
+  document.querySelectorAll('#fixed tr').forEach(function (tr, i) {
+    if (tr.querySelector('.el-checkbox__input.is-checked')) checked.push(state.rows[i]);
+  });
+  if (!checked.length) { message('warning', '请至少选择一条合同'); return; }
+  model = {};
+  Object.keys(controls).forEach(function (prop) { controls[prop].reset(); });
+  state.selected = checked;
+  setTimeout(function () { $('dialog').style.display = 'block'; }, CONFIG.dialogDelay);
+});
+
+$('ok').addEventListener('click', function () {
+  var missing = FIELDS.filter(function (f) { return !model[f.prop]; });
+  if (missing.length) { message('error', '请完善' + missing[0].label); return; }
+  setLoading(true);
+  var contract = state.selected[0];
+  api(CONFIG.applyPath, Object.assign({}, model, {contractId: contract.id, contractNo: contract.contractNo})).then(function (body) {
+    if (body.code !== 200) {
+      setLoading(false);
+      message('error', body.msg || '申请失败');
+      return;
+    }
+    closeDialog();
+    message('success', '申请成功');
+    load();
+  });
+});
+
+load();
+</script>
+</body></html>
+"""
+)
+
+
+class MockCrm:
+    """在后台线程运行的模拟CRM服务"""
+
+    SEARCH_PATH = "/api/contract/pendingList"
+    APPLY_PATH = "/api/invoice/apply"
+
+    def __init__(
+        self,
+        contracts,
+        latency=0.05,
+        jitter=0.0,
+        vue=True,
+        dialog_delay=0.0,
+        dropdown_delay=0.0,
+        host="127.0.0.1",
+        port=0,
+    ):
+        self.contracts = {c["contractNo"]: c for c in contracts}
+        self.latency = latency
+        self.jitter = jitter
+        self.vue = vue
+        self.dialog_delay = dialog_delay
+        self.dropdown_delay = dropdown_delay
+        self.applications = []
+        self.token = secrets.token_hex(8)
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @staticmethod
+    def generate_contracts(count):
+        return [
+            {
+                "id": i,
+                "contractNo": f"HT{i:05d}",
+                "customerName": f"客户{i}",
+                "amount": f"{1000 + i * 10:.2f}",
+            }
+            for i in range(1, count + 1)
+        ]
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, name="mock-crm", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def contract_page(self):
+        config = {
+            "vue": self.vue,
+            "contents": list(INVOICE_CONTENTS),
+            "searchPath": self.SEARCH_PATH,
+            "applyPath": self.APPLY_PATH,
+            "dialogDelay": int(self.dialog_delay * 1000),
+            "dropdownDelay": int(self.dropdown_delay * 1000),
+        }
+        return CONTRACT_PAGE.replace(
+            "__CONFIG__", json.dumps(config, ensure_ascii=False)
+        )
+
+    def search(self, payload):
+        keyword = str(payload.get("contractNo") or "").strip()
+        page = max(1, int(payload.get("pageNum") or 1))
+        size = max(1, int(payload.get("pageSize") or 20))
+        rows = [c for no, c in self.contracts.items() if keyword in no]
+        return {"records": rows[(page - 1) * size : page * size], "total": len(rows)}
+
+    def apply(self, payload):
+        if payload.get("contractNo") not in self.contracts:
+            return 500, "合同不存在"
+        if payload.get("invoiceContext") not in INVOICE_CONTENTS:
+            return 500, "发票内容不正确"
+        with self._lock:
+            self.applications.append(payload)
+        return 200, ""
+
+    def _delay(self):
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+
+    def _handler(self):
+        crm = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _logged_in(self):
+                cookie = SimpleCookie(self.headers.get("Cookie") or "")
+                return (
+                    cookie.get("mock_session") is not None
+                    and cookie["mock_session"].value == crm.token
+                ) or self.headers.get("token") == crm.token
+
+            def _send(
+                self, status, body, content_type="application/json", headers=None
+            ):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _json(self, body, headers=None):
+                self._send(200, json.dumps(body, ensure_ascii=False), headers=headers)
+
+            def do_GET(self):
+                path = self.path.split("?")[0].split("#")[0]
+                if path == "/home" and self._logged_in():
+                    self._send(200, HOME_PAGE, "text/html")
+                elif path == "/hetong" and self._logged_in():
+                    self._send(200, crm.contract_page(), "text/html")
+                elif path == "/api/stats":
+                    self._json({"applications": len(crm.applications)})
+                elif path in ("/", "/home", "/hetong", "/login"):
+                    self._send(200, LOGIN_PAGE, "text/html")
+                else:
+                    self._send(404, "not found", "text/plain")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    payload = {}
+
+                if self.path == "/api/login":
+                    crm._delay()
+                    self._json(
+                        {"code": 200, "data": {"token": crm.token}},
+                        headers={"Set-Cookie": f"mock_session={crm.token}; Path=/"},
+                    )
+                    return
+                if not self._logged_in():
+                    self._json({"code": 401, "msg": "未登录"})
+                    return
+
+                crm._delay()
+                if self.path == crm.SEARCH_PATH:
+                    self._json({"code": 200, "data": crm.search(payload)})
+                elif self.path == crm.APPLY_PATH:
+                    code, msg = crm.apply(payload)
+                    self._json({"code": code, "msg": msg})
+                else:
+                    self._send(404, "not found", "text/plain")
+
+        return Handler
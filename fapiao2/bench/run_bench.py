@@ -0,0 +1,250 @@
+"""基准测试：启动本地模拟CRM，以无头浏览器驱动真实的 InvoiceProcessor 处理一批记录
+
+用法（在 fapiao2 目录下）：
+    python -m bench.run_bench --records 200 --workers 4 --latency 0.05
+    python -m bench.run_bench --records 200 --baseline bench/results/xxx.json
+
+结果（每分钟记录数、各步骤耗时、WebDriver命令数）保存为 bench/results/<时间>_<标签>.json，
+指定 --baseline 时同时打印与基线结果的对比。
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import pandas as pd
+from loguru import logger
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from bench.mock_crm import INVOICE_CONTENTS, MockCrm
+from src.core.invoice_processor import InvoiceProcessor
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+class CommandCounter:
+    """统计所有浏览器会话发出的WebDriver命令（每条命令即一次HTTP往返）"""
+
+    def __init__(self):
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self._original = None
+
+    def install(self):
+        original = self._original = WebDriver.execute
+        counter = self
+
+        def execute(driver, driver_command, params=None):
+            with counter._lock:
+                counter.counts[driver_command] += 1
+            return original(driver, driver_command, params)
+
+        WebDriver.execute = execute
+
+    def uninstall(self):
+        if self._original:
+            WebDriver.execute = self._original
+            self._original = None
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+
+def write_input(path, contracts, records, missing_rate, seed):
+    """生成输入Excel：从模拟合同中随机抽取，按比例混入不存在的合同编号"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(records):
+        if rng.random() < missing_rate:
+            contract_no = f"HX{i:05d}"
+        else:
+            contract_no = rng.choice(contracts)["contractNo"]
+        rows.append(
+            {
+                "合同编号": contract_no,
+                "开票项目": rng.choice(INVOICE_CONTENTS),
+                "开票金额": round(rng.uniform(100, 5000), 2),
+            }
+        )
+    pd.DataFrame(rows).to_excel(path, index=False)
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def compare(result, baseline_path):
+    """打印与基线结果的对比"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    def delta(new, old):
+        return f"{old} → {new}" + (
+            f"（{(new - old) / old * 100:+.1f}%）" if old else ""
+        )
+
+    print(
+        f"\n与基线 {os.path.basename(baseline_path)}（{baseline.get('revision', '')}）对比："
+    )
+    print(
+        f"  每分钟记录数: {delta(result['records_per_minute'], baseline['records_per_minute'])}"
+    )
+    print(
+        f"  每条记录命令数: {delta(result['commands_per_record'], baseline['commands_per_record'])}"
+    )
+    for step, stats in result["steps"].items():
+        old = baseline["steps"].get(step)
+        if old:
+            print(
+                f"  {step:<16} p50 {delta(stats['p50'], old['p50'])}  p95 {delta(stats['p95'], old['p95'])}"
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="发票申请处理基准测试（本地模拟CRM）")
+    parser.add_argument("--records", type=int, default=100, help="处理的记录数")
+    parser.add_argument("--contracts", type=int, default=500, help="模拟合同数量")
+    parser.add_argument("--workers", type=int, default=1, help="并发浏览器数")
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="接口固定延迟（秒）"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="接口随机附加延迟上限（秒）"
+    )
+    parser.add_argument(
+        "--dialog-delay", type=float, default=0.0, help="对话框打开延迟（秒）"
+    )
+    parser.add_argument(
+        "--dropdown-delay", type=float, default=0.0, help="下拉框展开延迟（秒）"
+    )
+    parser.add_argument(
+        "--missing-rate", type=float, default=0.05, help="不存在的合同编号比例"
+    )
+    parser.add_argument(
+        "--no-vue", action="store_true", help="不暴露组件实例，走逐项点击填写"
+    )
+    parser.add_argument("--http-mode", action="store_true", help="启用HTTP直连提交")
+    parser.add_argument("--batch", action="store_true", help="同合同批量申请")
+    parser.add_argument("--prefetch-index", action="store_true", help="预抓取合同索引")
+    parser.add_argument("--driver-path", default=None, help="Chrome驱动路径")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--label", default="", help="结果文件名标签")
+    parser.add_argument("--baseline", default=None, help="用于对比的历史结果JSON")
+    parser.add_argument("--verbose", action="store_true", help="输出处理日志")
+    args = parser.parse_args(argv)
+
+    logger.remove()
+    logger.add(sys.stderr, level="INFO" if args.verbose else "WARNING")
+
+    contracts = MockCrm.generate_contracts(args.contracts)
+    crm = MockCrm(
+        contracts,
+        latency=args.latency,
+        jitter=args.jitter,
+        vue=not args.no_vue,
+        dialog_delay=args.dialog_delay,
+        dropdown_delay=args.dropdown_delay,
+    ).start()
+    os.environ["CRM_URL"] = crm.base_url + "/"
+    os.environ["HETONG_URL"] = crm.base_url + "/hetong"
+    os.environ.pop("CRM_API_URL", None)
+
+    workdir = tempfile.mkdtemp(prefix="fapiao_bench_")
+    excel_path = os.path.join(workdir, "input.xlsx")
+    write_input(excel_path, contracts, args.records, args.missing_rate, args.seed)
+
+    processor = InvoiceProcessor(
+        excel_path=excel_path,
+        username="bench",
+        password="bench",
+        email="bench@example.com",
+        error_file=os.path.join(workdir, "error_records.xlsx"),
+        logger=logger,
+        screenshot_dir=os.path.join(workdir, "screenshots"),
+        driver_path=args.driver_path,
+        workers=args.workers,
+        http_mode=args.http_mode,
+        batch_mode=args.batch,
+        prefetch_index=args.prefetch_index,
+        lean_browser=True,
+    )
+    processor.metrics.path = os.path.join(workdir, "metrics.jsonl")
+    if processor.contract_index:
+        # 不读写正式的合同索引缓存
+        processor.contract_index.cache_path = os.path.join(
+            workdir, "contract_index.json"
+        )
+    processor.option_cache.cache_path = os.path.join(workdir, "invoice_options.json")
+
+    errors = []
+    counter = CommandCounter()
+    counter.install()
+    start = time.perf_counter()
+    try:
+        processor.process(lambda value, text: None, lambda: True, errors.append)
+    finally:
+        wall = time.perf_counter() - start
+        counter.uninstall()
+        crm.stop()
+
+    summary = processor.metrics.summary()
+    records = summary["records"]
+    result = {
+        "revision": git_revision(),
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "config": vars(args),
+        "wall_seconds": round(wall, 2),
+        "records": records,
+        "records_per_minute": round(records / (wall / 60), 2) if wall > 0 else 0.0,
+        "submitted": len(crm.applications),
+        "errors": processor.error_sink.count,
+        "run_errors": errors,
+        "commands": dict(counter.counts.most_common()),
+        "commands_total": counter.total,
+        "commands_per_record": round(counter.total / records, 1) if records else 0.0,
+        "steps": summary["steps"],
+        "counters": summary["counters"],
+    }
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    name = time.strftime("%Y%m%d_%H%M%S") + (f"_{args.label}" if args.label else "")
+    result_path = os.path.join(RESULTS_DIR, f"{name}.json")
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    print(
+        f"{records}条记录，用时{result['wall_seconds']}秒，{result['records_per_minute']}条/分钟；"
+        f"成功提交{result['submitted']}条，错误{result['errors']}条；"
+        f"WebDriver命令{result['commands_total']}次（每条{result['commands_per_record']}次）"
+    )
+    for step, stats in sorted(
+        result["steps"].items(), key=lambda item: -item[1]["total"]
+    ):
+        print(
+            f"  {step:<24} n={stats['count']:<5} p50={stats['p50']:.3f}s p95={stats['p95']:.3f}s max={stats['max']:.3f}s"
+        )
+    print(f"结果已保存: {result_path}")
+
+    if args.baseline:
+        compare(result, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
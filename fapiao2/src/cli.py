@@ -0,0 +1,166 @@
+"""命令行运行入口（不依赖Tk，可用于定时任务或无显示器的服务器）
+
+用法（在 fapiao2 目录下）：
+    python -m src.cli 发票数据.xlsx --workers 4 --lean
+    python -m src.cli 发票数据.xlsx --resume --summary-file run.json
+
+用户名、密码默认取自环境变量或 .env 中的 USER_NAME / PASSWORD。
+进度逐行输出到标准输出，最后一行为JSON格式的运行汇总；日志输出到标准错误。
+退出码：0 运行完成（个别记录失败见汇总），1 运行出错，2 参数错误。
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import signal
+import sys
+import threading
+
+from src.core.events import EventBus, RecordResult
+from src.utils.dotenv_loader import load_env
+from src.utils.logger import setup_logger
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli", description="发票申请批量处理（命令行）"
+    )
+    parser.add_argument("excel_path", help="发票数据Excel文件")
+    parser.add_argument(
+        "--username", default=None, help="登录用户名（默认取 USER_NAME）"
+    )
+    parser.add_argument("--password", default=None, help="登录密码（默认取 PASSWORD）")
+    parser.add_argument(
+        "--email",
+        default=None,
+        help="发票接收邮箱（默认取 EMAIL，未设置时为 fapiao@cuour.org）",
+    )
+    parser.add_argument(
+        "--error-file", default="error_records.xlsx", help="错误记录Excel路径"
+    )
+    parser.add_argument(
+        "--screenshot-dir", default="screenshots", help="错误截图保存目录"
+    )
+    parser.add_argument("--driver-path", default=None, help="Chrome驱动路径")
+    parser.add_argument("--workers", type=int, default=1, help="并发浏览器数")
+    parser.add_argument("--http-mode", action="store_true", help="HTTP直连提交")
+    parser.add_argument(
+        "--duplicates",
+        choices=("keep", "merge", "reject"),
+        default=None,
+        help="同一合同编号多行记录：keep 逐条处理（默认），merge 合为一组只搜索一次，reject 只处理第一条",
+    )
+    parser.add_argument(
+        "--batch", action="store_true", help="同合同批量申请（等同 --duplicates merge）"
+    )
+    parser.add_argument("--prefetch-index", action="store_true", help="预抓取合同索引")
+    parser.add_argument(
+        "--resume", action="store_true", help="断点续跑，跳过已提交的记录"
+    )
+    parser.add_argument("--lean", action="store_true", help="精简浏览器（无头模式）")
+    parser.add_argument("--persist-session", action="store_true", help="保持登录")
+    parser.add_argument("--summary-file", default=None, help="运行汇总另存为JSON文件")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # .env 加载过程中的提示输出到标准错误，标准输出只留给进度和汇总
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            load_env()
+        except FileNotFoundError:
+            pass
+    logger = setup_logger()
+
+    username = args.username or os.getenv("USER_NAME")
+    password = args.password or os.getenv("PASSWORD")
+    if not username or not password:
+        print(
+            "缺少用户名或密码：请通过参数或 USER_NAME / PASSWORD 环境变量提供",
+            file=sys.stderr,
+        )
+        return 2
+    if not os.path.exists(args.excel_path):
+        print(f"Excel文件不存在: {args.excel_path}", file=sys.stderr)
+        return 2
+
+    # 放在参数校验之后导入，--help 和参数错误不必加载selenium/pandas
+    from src.core.invoice_processor import InvoiceProcessor
+
+    processor = InvoiceProcessor(
+        excel_path=args.excel_path,
+        username=username,
+        password=password,
+        email=args.email or os.getenv("EMAIL") or "fapiao@cuour.org",
+        error_file=os.path.abspath(args.error_file),
+        logger=logger,
+        screenshot_dir=os.path.abspath(args.screenshot_dir),
+        driver_path=args.driver_path,
+        workers=args.workers,
+        http_mode=args.http_mode,
+        batch_mode=args.batch,
+        duplicate_policy=args.duplicates,
+        prefetch_index=args.prefetch_index,
+        resume=args.resume,
+        lean_browser=args.lean,
+        persist_session=args.persist_session,
+    )
+    processor.events = EventBus()
+
+    # 第一次Ctrl+C处理完当前记录后停止，第二次立即退出
+    stopping = threading.Event()
+
+    def request_stop(signum, frame):
+        logger.warning("收到中断信号，处理完当前记录后停止（再次中断立即退出）")
+        stopping.set()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    signal.signal(signal.SIGINT, request_stop)
+
+    run_errors = []
+
+    def on_progress(value, text):
+        print(f"[{value:5.1f}%] {text}", flush=True)
+
+    def on_error(message):
+        run_errors.append(message)
+        logger.error(message)
+
+    try:
+        processor.process(on_progress, lambda: not stopping.is_set(), on_error)
+    except Exception as e:
+        on_error(f"处理过程出错: {e}")
+
+    results = [
+        event for event in processor.events.drain() if isinstance(event, RecordResult)
+    ]
+    metrics = processor.metrics.summary()
+    summary = {
+        "status": (
+            "failed" if run_errors else ("stopped" if stopping.is_set() else "finished")
+        ),
+        "total": processor.total,
+        "processed": len(results),
+        "succeeded": sum(1 for event in results if event.ok),
+        "failed": sum(1 for event in results if not event.ok),
+        "elapsed_seconds": metrics["elapsed_seconds"],
+        "records_per_minute": metrics["records_per_minute"],
+        "error_file": processor.error_file if processor.error_sink.count else "",
+        "run_errors": run_errors,
+        "counters": metrics["counters"],
+    }
+
+    if args.summary_file:
+        with open(args.summary_file, "w", encoding="utf-8") as f:
+            json.dump(
+                {**summary, "steps": metrics["steps"]}, f, ensure_ascii=False, indent=2
+            )
+    print(json.dumps(summary, ensure_ascii=False), flush=True)
+    return 1 if run_errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,74 @@
+import json
 import os
+import tempfile
+from urllib.parse import urlsplit
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 
+# 精简模式下通过CDP屏蔽的资源：图片、字体和常见第三方统计脚本
+DEFAULT_BLOCKED_URLS = [
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.gif",
+    "*.webp",
+    "*.svg",
+    "*.ico",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.otf",
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*hm.baidu.com*",
+    "*cnzz.com*",
+]
+
+
+_JS_DUMP_STORAGE = """
+var dump = function (storage) {
+    var items = {};
+    for (var i = 0; i < storage.length; i++) {
+        var key = storage.key(i);
+        items[key] = storage.getItem(key);
+    }
+    return items;
+};
+return {local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+_JS_LOAD_STORAGE = """
+var data = arguments[0];
+Object.keys(data.local || {}).forEach(function (k) { window.localStorage.setItem(k, data.local[k]); });
+Object.keys(data.session || {}).forEach(function (k) { window.sessionStorage.setItem(k, data.session[k]); });
+"""
+
 
 class BrowserDriver:
-    def __init__(self, logger, driver_path=None):
+    def __init__(
+        self,
+        logger,
+        driver_path=None,
+        lean=False,
+        blocked_urls=None,
+        window_size=(1920, 1080),
+        profile_dir=None,
+    ):
         self.driver = None
         self.logger = logger
         self.driver_path = driver_path
+        # 精简模式：无头、固定视口、eager页面加载并屏蔽无关资源
+        self.lean = lean
+        self.window_size = window_size
+        if blocked_urls is None:
+            # 环境变量 BLOCKED_URLS（逗号分隔）可追加需要屏蔽的地址
+            extra = os.getenv("BLOCKED_URLS") or ""
+            blocked_urls = DEFAULT_BLOCKED_URLS + [
+                url.strip() for url in extra.split(",") if url.strip()
+            ]
+        self.blocked_urls = blocked_urls
+        # 持久化的Chrome用户目录（保留Cookie和静态资源缓存），同一目录同时只能被一个浏览器使用
+        self.profile_dir = profile_dir
 
     def init_driver(self):
         try:
@@ -38,16 +99,108 @@ class BrowserDriver:
 
             service = ChromeService(executable_path=driver_path)
             options = webdriver.ChromeOptions()
-            # 可以添加一些选项，如无头模式
-            # options.add_argument("--headless=new")
+            if self.lean:
+                self._apply_lean_options(options)
+            if self.profile_dir:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                options.add_argument(
+                    f"--user-data-dir={os.path.abspath(self.profile_dir)}"
+                )
+                self.logger.info(f"使用持久化浏览器用户目录: {self.profile_dir}")
             self.driver = webdriver.Chrome(service=service, options=options)
-            self.driver.maximize_window()
-            self.logger.info("Chrome浏览器已启动并最大化窗口")
+            if self.lean:
+                self._block_resources()
+                self.logger.info("Chrome浏览器已以精简模式（无头）启动")
+            else:
+                self.driver.maximize_window()
+                self.logger.info("Chrome浏览器已启动并最大化窗口")
             return True
         except Exception as e:
             self.logger.error(f"初始化浏览器失败: {e}")
             return False
 
+    def _apply_lean_options(self, options):
+        width, height = self.window_size
+        options.add_argument("--headless=new")
+        options.add_argument(f"--window-size={width},{height}")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--no-first-run")
+        options.add_argument("--disable-background-networking")
+        # DOMContentLoaded后即返回，页面就绪由条件等待判断
+        options.page_load_strategy = "eager"
+
+    def _block_resources(self):
+        if not self.blocked_urls:
+            return
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd(
+                "Network.setBlockedURLs", {"urls": self.blocked_urls}
+            )
+            self.logger.info(f"已屏蔽{len(self.blocked_urls)}类无关资源请求")
+        except Exception as e:
+            self.logger.warning(f"设置资源屏蔽失败：{e}")
+
+    def save_session(self, path, owner=""):
+        """将当前站点的Cookie和localStorage/sessionStorage序列化到磁盘"""
+        try:
+            session = {
+                "owner": owner,
+                "url": self.driver.current_url,
+                "cookies": self.driver.get_cookies(),
+                "storage": self.driver.execute_script(_JS_DUMP_STORAGE),
+            }
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            # 并发模式下多个会话可能同时保存，每个写入方使用各自的临时文件再原子替换
+            fd, tmp_path = tempfile.mkstemp(
+                prefix="session_", suffix=".tmp", dir=directory
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(session, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self.logger.info(f"已缓存登录会话: {path}")
+            return True
+        except Exception as e:
+            self.logger.warning(f"缓存登录会话失败: {e}")
+            return False
+
+    def restore_session(self, path, url, owner=""):
+        """从磁盘恢复Cookie和存储；只恢复同一账号、同一站点的会话"""
+        try:
+            if not os.path.exists(path):
+                return False
+            with open(path, "r", encoding="utf-8") as f:
+                session = json.load(f)
+            if session.get("owner") != owner:
+                self.logger.info("缓存的登录会话属于其他账号，忽略")
+                return False
+            if urlsplit(session.get("url") or "").netloc != urlsplit(url).netloc:
+                return False
+
+            # 必须先打开同域页面才能写入Cookie和存储
+            self.driver.get(url)
+            for cookie in session.get("cookies", []):
+                cookie.pop("sameSite", None)
+                if "expiry" in cookie:
+                    cookie["expiry"] = int(cookie["expiry"])
+                try:
+                    self.driver.add_cookie(cookie)
+                except Exception:
+                    continue
+            self.driver.execute_script(_JS_LOAD_STORAGE, session.get("storage") or {})
+            self.logger.info("已恢复缓存的登录会话")
+            return True
+        except Exception as e:
+            self.logger.warning(f"恢复登录会话失败: {e}")
+            return False
+
     def quit(self):
         if self.driver:
             try:
@@ -0,0 +1,163 @@
+import json
+import os
+import time
+
+# 一次往返读取当前页表格：表头 + 每行单元格文本
+_JS_READ_TABLE = """
+var table = document.querySelector('.el-table');
+if (!table) return null;
+var headers = Array.prototype.map.call(
+    table.querySelectorAll('.el-table__header-wrapper th'),
+    function (th) { return th.textContent.trim(); }
+);
+var rows = Array.prototype.map.call(
+    table.querySelectorAll('.el-table__body-wrapper tbody tr'),
+    function (tr) {
+        return Array.prototype.map.call(tr.querySelectorAll('td'), function (td) {
+            return td.textContent.trim();
+        });
+    }
+);
+return {headers: headers, rows: rows};
+"""
+
+# 点击分页「下一页」，已是最后一页时返回false
+_JS_NEXT_PAGE = """
+var btn = document.querySelector('.el-pagination .btn-next');
+if (!btn || btn.disabled || btn.classList.contains('disabled')) return false;
+btn.click();
+return true;
+"""
+
+_JS_FIRST_ROW = """
+var row = document.querySelector('.el-table__body-wrapper tbody tr');
+return row ? row.textContent : '';
+"""
+
+
+class ContractIndex:
+    """待开班合同表的内存索引：合同编号 → 行数据
+
+    磁盘缓存仅在当天且未超过TTL（默认12小时，环境变量 CONTRACT_INDEX_TTL 可覆盖）时复用，
+    并且必须是同一合同表地址、同一账号抓取的。
+    """
+
+    KEY_COLUMN = "合同编号"
+
+    def __init__(self, logger, cache_path=None, ttl=None, url=None, owner=""):
+        self.logger = logger
+        self.cache_path = cache_path or self.default_cache_path()
+        # 缓存来源：合同表地址和登录账号，不一致的缓存不复用
+        self.url = url if url is not None else os.getenv("HETONG_URL") or ""
+        self.owner = owner
+        self.ttl = (
+            ttl
+            if ttl is not None
+            else int(os.getenv("CONTRACT_INDEX_TTL") or 12 * 3600)
+        )
+        self.rows = {}
+        self.ready = False
+
+    @staticmethod
+    def default_cache_path():
+        """缓存文件保存到与src同级的cache文件夹"""
+        current_path = os.path.abspath(__file__)
+        root_dir = os.path.dirname(os.path.dirname(os.path.dirname(current_path)))
+        return os.path.join(root_dir, "cache", "contract_index.json")
+
+    def __contains__(self, contract_no):
+        return str(contract_no).strip() in self.rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get(self, contract_no):
+        return self.rows.get(str(contract_no).strip())
+
+    def load_cache(self) -> bool:
+        """读取未过期的磁盘缓存"""
+        try:
+            if not os.path.exists(self.cache_path):
+                return False
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            if cache.get("url") != self.url or cache.get("owner") != self.owner:
+                self.logger.info("合同索引缓存来自其他合同表地址或账号，重新抓取")
+                return False
+            created_at = cache.get("created_at", 0)
+            age = time.time() - created_at
+            same_day = time.strftime(
+                "%Y%m%d", time.localtime(created_at)
+            ) == time.strftime("%Y%m%d")
+            if age > self.ttl or not same_day:
+                self.logger.info(f"合同索引缓存已过期（{int(age)}秒前生成），重新抓取")
+                return False
+            self.rows = cache.get("rows", {})
+            self.ready = True
+            self.logger.info(f"已加载合同索引缓存：{len(self.rows)}条合同")
+            return True
+        except Exception as e:
+            self.logger.warning(f"读取合同索引缓存失败：{e}")
+            return False
+
+    def save_cache(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "created_at": time.time(),
+                        "url": self.url,
+                        "owner": self.owner,
+                        "rows": self.rows,
+                    },
+                    f,
+                    ensure_ascii=False,
+                )
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            self.logger.warning(f"保存合同索引缓存失败：{e}")
+
+    def build(self, driver, wait, max_pages=1000) -> bool:
+        """从当前页开始逐页翻阅合同表，建立 合同编号 → 行数据 的索引"""
+        try:
+            rows = {}
+            for page in range(1, max_pages + 1):
+                wait.loading_finished(15)
+                table = driver.execute_script(_JS_READ_TABLE)
+                if not table:
+                    raise Exception("未找到合同表格")
+                headers = table["headers"]
+                if self.KEY_COLUMN not in headers:
+                    raise Exception(f"合同表格缺少「{self.KEY_COLUMN}」列")
+                key_index = headers.index(self.KEY_COLUMN)
+                for cells in table["rows"]:
+                    if key_index < len(cells) and cells[key_index]:
+                        rows[cells[key_index]] = dict(zip(headers, cells))
+
+                first_row = driver.execute_script(_JS_FIRST_ROW)
+                if not driver.execute_script(_JS_NEXT_PAGE):
+                    break
+                # 等待表格内容切换到下一页
+                wait.until(
+                    lambda d: d.execute_script(_JS_FIRST_ROW) != first_row,
+                    15,
+                    "合同表格翻页未完成",
+                )
+                if page % 20 == 0:
+                    self.logger.info(
+                        f"合同索引抓取中：已读取{page}页，{len(rows)}条合同"
+                    )
+            else:
+                # 没有翻到最后一页，不完整的索引会把后面的合同误判为未找到
+                raise Exception(f"超过{max_pages}页仍未读完，合同索引不完整")
+
+            self.rows = rows
+            self.ready = True
+            self.logger.info(f"合同索引建立完成：共{len(rows)}条合同")
+            self.save_cache()
+            return True
+        except Exception as e:
+            self.logger.error(f"建立合同索引失败：{e}")
+            return False
@@ -0,0 +1,204 @@
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Element UI 就绪信号，全部在浏览器端一次性判断，每次轮询只有一次WebDriver往返
+_JS_VISIBLE = """
+function visible(el) {
+    if (!el) return false;
+    var style = window.getComputedStyle(el);
+    return style.display !== 'none' && style.visibility !== 'hidden'
+        && el.getClientRects().length > 0;
+}
+"""
+
+_JS_LOADING_GONE = _JS_VISIBLE + """
+var masks = document.querySelectorAll('.el-loading-mask');
+for (var i = 0; i < masks.length; i++) {
+    if (visible(masks[i])) return false;
+}
+return true;
+"""
+
+_JS_VISIBLE_DROPDOWN = _JS_VISIBLE + """
+var poppers = document.querySelectorAll('.el-select-dropdown.el-popper');
+for (var i = 0; i < poppers.length; i++) {
+    if (visible(poppers[i])) return poppers[i];
+}
+return null;
+"""
+
+_JS_DIALOG = _JS_VISIBLE + """
+var dialog = document.querySelector('div.el-dialog[aria-label="' + arguments[0] + '"]');
+return visible(dialog) ? dialog : null;
+"""
+
+_JS_MESSAGE = _JS_VISIBLE + """
+var messages = document.querySelectorAll('div.el-message');
+for (var i = messages.length - 1; i >= 0; i--) {
+    if (!visible(messages[i])) continue;
+    var content = messages[i].querySelector('.el-message__content');
+    var match = (messages[i].className || '').match(/el-message--(\\w+)/);
+    return {type: match ? match[1] : 'info', text: content ? content.textContent.trim() : ''};
+}
+return null;
+"""
+
+# 点击搜索前在页面上安装观察器：表格内容或加载遮罩发生变化后才认为表格已刷新，
+# 避免上一次搜索留下的「暂无数据」在新请求返回前被当作本次结果；
+# 同时记下开始时间，重复同一搜索、页面没有任何变化时按稳定窗口判断
+_JS_WATCH_REFRESH = """
+if (window.__tableRefreshObserver) window.__tableRefreshObserver.disconnect();
+window.__tableRefreshed = false;
+window.__tableWatchStart = Date.now();
+function relevant(node) {
+    if (node && node.nodeType !== 1) node = node.parentElement;
+    return !!(node && node.closest && (node.closest('.el-table__body-wrapper') || node.closest('.el-loading-mask')));
+}
+var observer = new MutationObserver(function (mutations) {
+    for (var i = 0; i < mutations.length; i++) {
+        var added = Array.prototype.slice.call(mutations[i].addedNodes);
+        if (relevant(mutations[i].target) || added.some(relevant)) {
+            window.__tableRefreshed = true;
+            observer.disconnect();
+            return;
+        }
+    }
+});
+observer.observe(document.body, {
+    childList: true, characterData: true, subtree: true, attributes: true, attributeFilter: ['style']
+});
+window.__tableRefreshObserver = observer;
+"""
+
+_JS_SEARCH_SETTLED = _JS_LOADING_GONE.replace(
+    "return true;",
+    """
+var refreshed = window.__tableRefreshed;
+if (!refreshed && Date.now() - (window.__tableWatchStart || 0) < arguments[1]) return false;
+var body = document.querySelector('.el-table__body-wrapper');
+if (!body) return false;
+var empty = body.querySelector('.el-table__empty-block');
+if (visible(empty)) return refreshed ? 'empty' : false;
+var rows = body.querySelectorAll('tbody tr');
+if (rows.length === 0) return false;
+for (var i = 0; i < rows.length; i++) {
+    if (rows[i].textContent.indexOf(arguments[0]) === -1) return false;
+}
+return 'found';
+""",
+)
+
+
+class ElementWait:
+    """基于条件的等待引擎，识别Element UI的页面就绪信号，条件满足后立即返回"""
+
+    def __init__(self, driver, timeout=10, poll_frequency=0.1):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+
+    def until(self, condition, timeout=None, message=""):
+        """通用等待：condition(driver) 返回真值时立即返回该值"""
+        return WebDriverWait(
+            self.driver,
+            self.timeout if timeout is None else timeout,
+            poll_frequency=self.poll_frequency,
+        ).until(condition, message)
+
+    def _script(self, script, *args, timeout=None, message=""):
+        return self.until(
+            lambda driver: driver.execute_script(script, *args), timeout, message
+        )
+
+    def present(self, locator, timeout=None):
+        return self.until(EC.presence_of_element_located(locator), timeout)
+
+    def all_present(self, locator, timeout=None):
+        return self.until(EC.presence_of_all_elements_located(locator), timeout)
+
+    def clickable(self, locator, timeout=None):
+        return self.until(EC.element_to_be_clickable(locator), timeout)
+
+    def loading_finished(self, timeout=None):
+        """等待所有 el-loading-mask 消失"""
+        return self._script(_JS_LOADING_GONE, timeout=timeout, message="加载遮罩未消失")
+
+    def dropdown_visible(self, timeout=None):
+        """等待下拉选择框的弹出层出现，返回该弹出层元素"""
+        return self._script(
+            _JS_VISIBLE_DROPDOWN, timeout=timeout, message="下拉框未展开"
+        )
+
+    def dropdown_hidden(self, timeout=None):
+        """等待所有下拉选择框的弹出层收起"""
+        return self.until(
+            lambda driver: driver.execute_script(_JS_VISIBLE_DROPDOWN) is None,
+            timeout,
+            "下拉框未收起",
+        )
+
+    def dialog_open(self, title, timeout=None):
+        """等待指定标题的 el-dialog 打开，返回对话框元素"""
+        return self._script(
+            _JS_DIALOG, title, timeout=timeout, message=f"对话框「{title}」未打开"
+        )
+
+    def dialog_closed(self, title, timeout=None):
+        """等待指定标题的 el-dialog 关闭"""
+        return self.until(
+            lambda driver: driver.execute_script(_JS_DIALOG, title) is None,
+            timeout,
+            f"对话框「{title}」未关闭",
+        )
+
+    def clear_messages(self):
+        """移除页面上残留的 el-message，避免上一条记录的提示干扰本次判断"""
+        self.driver.execute_script(
+            "document.querySelectorAll('div.el-message').forEach(function (m) { m.remove(); });"
+        )
+
+    def dialog_or_message(self, title, timeout=None):
+        """点击操作后等待对话框打开或提示出现，返回 ("dialog", 元素) 或 ("message", 提示)"""
+
+        def condition(driver):
+            message = driver.execute_script(_JS_MESSAGE)
+            if message and message.get("type") in ("warning", "error"):
+                return "message", message
+            dialog = driver.execute_script(_JS_DIALOG, title)
+            if dialog:
+                return "dialog", dialog
+            return False
+
+        return self.until(condition, timeout, f"对话框「{title}」未打开且无提示")
+
+    def closed_or_message(self, title, timeout=None):
+        """提交后等待对话框关闭或出现提示，返回 ("closed", None) 或 ("message", 提示)"""
+
+        def condition(driver):
+            message = driver.execute_script(_JS_MESSAGE)
+            if message and message.get("type") in ("warning", "error"):
+                return "message", message
+            if driver.execute_script(_JS_DIALOG, title) is None:
+                return "closed", None
+            return False
+
+        return self.until(condition, timeout, f"对话框「{title}」未关闭且无提示")
+
+    def watch_table_refresh(self):
+        """点击搜索之前调用，之后的 search_settled 只接受表格刷新后的结果"""
+        self.driver.execute_script(_JS_WATCH_REFRESH)
+
+    def search_settled(self, keyword, timeout=None, settle=1.5):
+        """搜索后等待表格刷新完成：返回 "found"（每一行都包含关键字）或 "empty"（暂无数据）
+
+        需要先调用 watch_table_refresh。重复同一搜索时表格可能没有任何变化，
+        超过稳定窗口 settle 秒且没有加载遮罩时，现有的行都包含关键字也视为 "found"；
+        「暂无数据」只在表格确实刷新后才接受。
+        """
+        return self._script(
+            _JS_SEARCH_SETTLED,
+            keyword,
+            int(settle * 1000),
+            timeout=timeout,
+            message="搜索结果未刷新",
+        )
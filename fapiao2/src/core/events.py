@@ -0,0 +1,87 @@
+import queue
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Progress:
+    """整体进度（0-100）和进度文本"""
+
+    value: float
+    text: str
+
+
+@dataclass(frozen=True)
+class RecordResult:
+    """单条记录的最终结果"""
+
+    contract_no: str
+    ok: bool
+    reason: str = ""
+
+
+@dataclass(frozen=True)
+class RunError:
+    """需要提示用户的运行错误"""
+
+    message: str
+
+
+@dataclass(frozen=True)
+class StateChanged:
+    """运行状态变化：finished / failed / stopped"""
+
+    state: str
+    text: str = ""
+
+
+class EventBus:
+    """处理线程与界面之间的事件通道
+
+    任意线程调用 publish 只做入队；界面线程定时调用 dispatch 取出并分发给订阅者，
+    同一批中的进度事件只保留最新一条，工作线程再多也不会刷屏。
+    """
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._handlers = {}
+
+    def subscribe(self, event_type, handler):
+        self._handlers.setdefault(event_type, []).append(handler)
+
+    def publish(self, event):
+        self._queue.put(event)
+
+    def progress(self, value, text):
+        """与 progress_callback 签名一致，可直接传给 InvoiceProcessor.process"""
+        self.publish(Progress(value, text))
+
+    def error(self, message):
+        """与 error_callback 签名一致"""
+        self.publish(RunError(message))
+
+    def drain(self):
+        """取出当前积压的全部事件，进度事件只保留最后一条（位置不变）"""
+        events = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        last_progress = None
+        for index, event in enumerate(events):
+            if isinstance(event, Progress):
+                last_progress = index
+        return [
+            event
+            for index, event in enumerate(events)
+            if not isinstance(event, Progress) or index == last_progress
+        ]
+
+    def dispatch(self):
+        """在界面线程中调用：分发积压事件，返回分发的事件数"""
+        events = self.drain()
+        for event in events:
+            for handler in self._handlers.get(type(event), ()):
+                handler(event)
+        return len(events)
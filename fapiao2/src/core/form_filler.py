@@ -0,0 +1,168 @@
+# 在对话框内按 label[for=字段名] 定位表单项：下拉框通过 el-select 组件方法选中选项，
+# 输入框写入原生值并派发 input/change 事件，由 v-model 同步到表单模型。
+# 下拉选项可能是打开对话框后异步加载的，找不到时在页面内轮询直到超时，整个过程只需一次往返。
+_JS_FILL_FORM = """
+var dialog = arguments[0], values = arguments[1], timeout = arguments[2], collect = arguments[3];
+var done = arguments[arguments.length - 1];
+// 与 pages.normalize_option 一致：全角转半角、合并连续空白
+var norm = function (s) {
+    return String(s == null ? '' : s).normalize('NFKC').replace(/\\s+/g, ' ').trim();
+};
+var deadline = Date.now() + timeout;
+
+var locate = function () {
+    var fields = {}, state = {unsupported: [], missing_fields: [], missing_options: [], options: {}};
+    Object.keys(values).forEach(function (prop) {
+        var label = dialog.querySelector("label[for='" + prop + "']");
+        var content = label && label.nextElementSibling;
+        if (!content) { state.missing_fields.push(prop); return; }
+        var selectEl = content.querySelector('.el-select');
+        if (selectEl) {
+            var select = selectEl.__vue__;
+            if (!select || !select.options) { state.unsupported.push(prop); return; }
+            if (collect) {
+                state.options[prop] = select.options.map(function (o) { return norm(o.currentLabel); });
+            }
+            var option = select.options.filter(function (o) {
+                return norm(o.currentLabel) === norm(values[prop]);
+            })[0];
+            if (!option) { state.missing_options.push(prop); return; }
+            fields[prop] = {select: select, option: option};
+            return;
+        }
+        var input = content.querySelector('input.el-input__inner, textarea.el-textarea__inner');
+        if (!input) { state.missing_fields.push(prop); return; }
+        fields[prop] = {input: input};
+    });
+    state.fields = fields;
+    return state;
+};
+
+var apply = function (fields) {
+    Object.keys(fields).forEach(function (prop) {
+        var field = fields[prop];
+        if (field.select) {
+            if (field.select.handleOptionClick) {
+                field.select.handleOptionClick(field.option, true);
+            } else {
+                field.select.$emit('input', field.option.value);
+                field.select.$emit('change', field.option.value);
+            }
+        } else {
+            field.input.value = values[prop];
+            field.input.dispatchEvent(new Event('input', {bubbles: true}));
+            field.input.dispatchEvent(new Event('change', {bubbles: true}));
+        }
+    });
+};
+
+var verify = function (fields) {
+    var result = {};
+    Object.keys(fields).forEach(function (prop) {
+        var field = fields[prop], actual;
+        if (field.select) {
+            actual = field.select.selectedLabel != null
+                ? field.select.selectedLabel
+                : field.select.$el.querySelector('input').value;
+        } else {
+            actual = field.input.value;
+        }
+        result[prop] = {expected: norm(values[prop]), actual: norm(actual)};
+    });
+    return result;
+};
+
+var attempt = function () {
+    var state = locate();
+    if (state.unsupported.length || state.missing_fields.length) {
+        delete state.fields;
+        return done(state);
+    }
+    if (state.missing_options.length) {
+        if (Date.now() < deadline) return setTimeout(attempt, 100);
+        delete state.fields;
+        return done(state);
+    }
+    apply(state.fields);
+    // 等待Vue在下一个tick把模型渲染回组件后再读取最终状态
+    setTimeout(function () {
+        done({fields: verify(state.fields), options: state.options});
+    }, 0);
+};
+attempt();
+"""
+
+
+class FormFillUnsupported(Exception):
+    """页面没有暴露可操作的组件实例，调用方应改为逐项点击填写"""
+
+
+class DialogFormFiller:
+    """通过 Element UI 组件模型一次性填写对话框表单，并返回最终表单状态用于校验"""
+
+    def __init__(self, driver, logger, option_timeout=3):
+        self.driver = driver
+        self.logger = logger
+        self.option_timeout = option_timeout
+        self.missing_options = {}
+        self.options = {}
+
+    def fill(self, dialog, values, collect_options=False) -> bool:
+        """填写表单并校验结果
+
+        Args:
+            dialog: 对话框元素
+            values: 字段名（label的for属性） → 要选择的选项文本或输入值
+            collect_options: 是否同时读取各下拉框的全部选项（保存到 self.options）
+
+        Raises:
+            FormFillUnsupported: 找不到字段或组件实例时抛出
+        """
+        values = {
+            prop: "" if value is None else str(value) for prop, value in values.items()
+        }
+        result = self.driver.execute_async_script(
+            _JS_FILL_FORM,
+            dialog,
+            values,
+            int(self.option_timeout * 1000),
+            collect_options,
+        )
+        if not result:
+            raise FormFillUnsupported("脚本未返回结果")
+        self.options = {
+            prop: items
+            for prop, items in (result.get("options") or {}).items()
+            if items
+        }
+        if result.get("unsupported") or result.get("missing_fields"):
+            raise FormFillUnsupported(
+                f"无法定位表单项: {result.get('unsupported', []) + result.get('missing_fields', [])}"
+            )
+        if result.get("missing_options"):
+            self.missing_options = {
+                prop: values[prop] for prop in result["missing_options"]
+            }
+            self.logger.error(f"下拉框中没有对应选项：{self.missing_options}")
+            return False
+
+        mismatched = {
+            prop: state
+            for prop, state in result.get("fields", {}).items()
+            if not self._same_value(state["expected"], state["actual"])
+        }
+        if mismatched:
+            self.logger.error(f"表单填写后校验不一致：{mismatched}")
+            return False
+        self.logger.info(f"已一次性填写发票表单：{values}")
+        return True
+
+    @staticmethod
+    def _same_value(expected, actual):
+        """金额输入框可能按精度格式化显示（100 → 100.00），数值相等即视为一致"""
+        if expected == actual:
+            return True
+        try:
+            return float(expected) == float(actual)
+        except ValueError:
+            return False
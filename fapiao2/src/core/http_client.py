@@ -0,0 +1,171 @@
+import json
+import os
+from urllib.parse import urljoin, urlsplit
+
+import urllib3
+
+# 前端调用的后端接口路径，可通过环境变量 CRM_API_SEARCH / CRM_API_APPLY 覆盖
+DEFAULT_ENDPOINTS = {
+    "search": "/api/contract/pendingList",
+    "apply": "/api/invoice/apply",
+}
+
+# 与「发票申请」对话框中固定选项一致的表单字段（字段名取自表单项的 label[for]）
+INVOICE_FORM_DEFAULTS = {
+    "invoiceGroup": "增值税普通发票",
+    "invoiceType": "电子票",
+    "invoiceUpHeadType": "个人",
+    "invoiceUpHead": "个人",
+}
+
+# 前端存放登录令牌时常用的 localStorage / sessionStorage 键名
+TOKEN_KEYS = ("token", "Authorization", "access_token", "Admin-Token")
+
+_JS_READ_TOKEN = """
+var keys = arguments[0];
+for (var i = 0; i < keys.length; i++) {
+    var value = window.localStorage.getItem(keys[i]) || window.sessionStorage.getItem(keys[i]);
+    if (value) return value;
+}
+return null;
+"""
+
+
+class HttpEngineError(Exception):
+    """接口调用失败（网络、鉴权或响应格式异常）"""
+
+
+class RequestNotSentError(HttpEngineError):
+    """连接未建立，请求没有发出，可以安全地改用浏览器流程重试"""
+
+
+class SubmitUnconfirmedError(Exception):
+    """申请请求可能已被服务器接收但结果未知，不能重试，否则可能重复申请"""
+
+
+class CrmBusinessError(Exception):
+    """接口正常返回但业务被拒绝（如合同已申请过发票）"""
+
+
+class CrmHttpClient:
+    """复用Selenium登录会话，直接调用CRM后端接口完成合同搜索与发票申请"""
+
+    def __init__(
+        self, base_url, cookies, logger, token=None, endpoints=None, timeout=10
+    ):
+        self.base_url = base_url.rstrip("/") + "/"
+        self.logger = logger
+        self.endpoints = {
+            "search": os.getenv("CRM_API_SEARCH") or DEFAULT_ENDPOINTS["search"],
+            "apply": os.getenv("CRM_API_APPLY") or DEFAULT_ENDPOINTS["apply"],
+            **(endpoints or {}),
+        }
+        self.timeout = urllib3.Timeout(total=timeout)
+        self.headers = {
+            "Accept": "application/json, text/plain, */*",
+            "Content-Type": "application/json;charset=UTF-8",
+            "Connection": "keep-alive",
+        }
+        if cookies:
+            self.headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in cookies.items())
+        if token:
+            self.headers["Authorization"] = token
+            self.headers["token"] = token
+        # 连接池复用长连接，避免每条记录重新握手
+        self.http = urllib3.PoolManager(num_pools=2, maxsize=4, retries=False)
+
+    @classmethod
+    def from_driver(cls, driver, logger, base_url=None, endpoints=None):
+        """从已登录的浏览器中提取Cookie和令牌创建客户端"""
+        cookies = {c["name"]: c["value"] for c in driver.get_cookies()}
+        token = driver.execute_script(_JS_READ_TOKEN, list(TOKEN_KEYS))
+        if not base_url:
+            base_url = os.getenv("CRM_API_URL")
+        if not base_url:
+            parts = urlsplit(driver.current_url)
+            base_url = f"{parts.scheme}://{parts.netloc}"
+        logger.info(
+            f"HTTP直连模式已启用: {base_url}（Cookie {len(cookies)}个，令牌{'已' if token else '未'}获取）"
+        )
+        return cls(base_url, cookies, logger, token=token, endpoints=endpoints)
+
+    def search_contract(self, contract_no):
+        """按合同编号搜索待开票合同，返回合同行列表"""
+        data = self._request(
+            "search", {"contractNo": contract_no, "pageNum": 1, "pageSize": 20}
+        )
+        if isinstance(data, dict):
+            for key in ("records", "list", "rows"):
+                if isinstance(data.get(key), list):
+                    return data[key]
+            raise HttpEngineError(f"无法识别的搜索响应: {list(data.keys())}")
+        if isinstance(data, list):
+            return data
+        return []
+
+    def apply_invoice(self, contract, content, amount, email):
+        """提交发票申请，返回 (是否成功, 提示信息)
+
+        请求发出后的任何异常（超时、5xx、非JSON响应、会话失效）都抛出 SubmitUnconfirmedError，
+        只有连接未建立时抛出 RequestNotSentError。
+        """
+        payload = {
+            **INVOICE_FORM_DEFAULTS,
+            "contractId": contract.get("id"),
+            "contractNo": contract.get("contractNo"),
+            "invoiceContext": content,
+            "billMoney": amount,
+            "invoiceEmail": email,
+        }
+        try:
+            self._request("apply", payload)
+            return True, ""
+        except CrmBusinessError as e:
+            return False, str(e)
+        except RequestNotSentError:
+            raise
+        except HttpEngineError as e:
+            raise SubmitUnconfirmedError(str(e)) from e
+
+    def close(self):
+        self.http.clear()
+
+    def _request(self, endpoint, payload):
+        url = urljoin(self.base_url, self.endpoints[endpoint].lstrip("/"))
+        try:
+            response = self.http.request(
+                "POST",
+                url,
+                body=json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+                headers=self.headers,
+                timeout=self.timeout,
+            )
+        except (
+            urllib3.exceptions.NewConnectionError,
+            urllib3.exceptions.ConnectTimeoutError,
+        ) as e:
+            raise RequestNotSentError(f"连接 {url} 失败: {e}") from e
+        except urllib3.exceptions.HTTPError as e:
+            raise HttpEngineError(f"请求 {url} 失败: {e}") from e
+
+        if response.status in (401, 403):
+            raise HttpEngineError(f"会话已失效（HTTP {response.status}）")
+        if response.status >= 400:
+            raise HttpEngineError(f"请求 {url} 返回 HTTP {response.status}")
+
+        try:
+            body = json.loads(response.data.decode("utf-8"))
+        except ValueError as e:
+            raise HttpEngineError(f"响应不是有效的JSON: {e}") from e
+
+        if not isinstance(body, dict):
+            raise HttpEngineError(f"无法识别的响应格式: {type(body).__name__}")
+
+        code = body.get("code")
+        if code in (401, 403):
+            raise HttpEngineError(f"会话已失效（code {code}）")
+        if code not in (0, 200, "0", "200", None):
+            raise CrmBusinessError(
+                body.get("msg") or body.get("message") or f"code {code}"
+            )
+        return body.get("data")
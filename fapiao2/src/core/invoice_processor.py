@@ -1,12 +1,80 @@
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from selenium.webdriver.common.by import By
-from selenium.common import TimeoutException
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from src.core.browser_driver import BrowserDriver
+from src.core.contract_index import ContractIndex
+from src.core.element_wait import ElementWait
+from src.core.events import RecordResult
+from src.core.form_filler import DialogFormFiller, FormFillUnsupported
+from src.core.http_client import (
+    INVOICE_FORM_DEFAULTS,
+    CrmBusinessError,
+    CrmHttpClient,
+    HttpEngineError,
+    RequestNotSentError,
+    SubmitUnconfirmedError,
+)
+from src.core.option_cache import OptionCache
+from src.core.pages import ContractPage, InvoiceDialog, OptionNotFound
+from src.core.planner import RunPlanner
+from src.core.preflight import PreflightValidator
+from src.core.retry import default_policies
+from src.core.worker_pool import WorkerPool
+from src.utils.error_sink import ErrorSink
 from src.utils.excel_handler import ExcelHandler
-from src.utils.logger import capture_screenshot
+from src.utils.journal import CheckpointJournal
+from src.utils.metrics import RunMetrics
+from src.utils.screenshot import ScreenshotService
+
+INVOICE_DIALOG_TITLE = "发票申请"
+
+# 会话缓存与持久化浏览器目录放在与src同级的cache文件夹
+CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "cache",
+)
+SESSION_CACHE_PATH = os.path.join(CACHE_DIR, "session.json")
+
+# 一次往返同步固定列复选框：勾选目标行、取消其余行，返回实际数据行数
+_JS_SYNC_CHECKBOXES = """
+var target = arguments[0];
+var rows = document.querySelectorAll('.el-table__fixed .el-table__fixed-body-wrapper tbody tr');
+for (var i = 0; i < rows.length; i++) {
+    var box = rows[i].querySelector('label.el-checkbox span.el-checkbox__input');
+    if (!box) continue;
+    var wanted = i === target;
+    if (box.classList.contains('is-checked') !== wanted) box.click();
+}
+return rows.length;
+"""
+
+_JS_CHECKED_ROWS = """
+var rows = document.querySelectorAll('.el-table__fixed .el-table__fixed-body-wrapper tbody tr');
+var checked = [];
+for (var i = 0; i < rows.length; i++) {
+    var box = rows[i].querySelector('label.el-checkbox span.el-checkbox__input');
+    if (box && box.classList.contains('is-checked')) checked.push(i);
+}
+return checked;
+"""
+
+# 「合同编号」列与目标编号完全一致的行；表格没有该列时返回null
+_JS_MATCHING_ROWS = """
+var headers = document.querySelectorAll('.el-table__header-wrapper th');
+var column = -1;
+for (var i = 0; i < headers.length; i++) {
+    if (headers[i].textContent.trim() === '合同编号') { column = i; break; }
+}
+if (column === -1) return null;
+var rows = document.querySelectorAll('.el-table__body-wrapper tbody tr');
+var matched = [];
+for (var i = 0; i < rows.length; i++) {
+    var cell = rows[i].querySelectorAll('td')[column];
+    if (cell && cell.textContent.trim() === arguments[0]) matched.push(i);
+}
+return matched;
+"""
 
 
 class InvoiceProcessor:
@@ -20,6 +88,15 @@ class InvoiceProcessor:
         logger,
         screenshot_dir,
         driver_path=None,
+        workers=1,
+        http_mode=False,
+        batch_mode=False,
+        duplicate_policy=None,
+        prefetch_index=False,
+        resume=False,
+        lean_browser=False,
+        persist_session=False,
+        worker_id=0,
     ):
         self.excel_path = excel_path
         self.username = username
@@ -29,23 +106,119 @@ class InvoiceProcessor:
         self.logger = logger
         self.screenshot_dir = screenshot_dir
         self.driver_path = driver_path
-        self.browser = BrowserDriver(logger, driver_path)
+        self.lean_browser = lean_browser
+        self.persist_session = persist_session
+        self.worker_id = worker_id
+        self._contract_page = None
+        self._invoice_dialog = None
+        self.browser = BrowserDriver(
+            logger,
+            driver_path,
+            lean=lean_browser,
+            # Chrome同一用户目录只能被一个进程占用，每个工作线程使用各自的目录
+            profile_dir=self.profile_dir() if persist_session else None,
+        )
+        self.workers = max(1, int(workers))
+        self.http_mode = http_mode
+        self.http = None
+        # 同一合同编号多行记录的处理策略（见 RunPlanner），batch_mode 等同于 merge
+        self.duplicate_policy = duplicate_policy or ("merge" if batch_mode else "keep")
+        self.groups = []
+        self.duplicate_contracts = 0
+        # 页面不支持一次性填写时置为False，之后的记录直接逐项填写
+        self.js_form_fill = True
+        self.retry_policies = default_policies()
+        # 页面给出明确结论（如提示已申请、下拉框无此选项）时记录原因，此类失败不重试
+        self.blocked_reason = ""
+        # 当前这组记录中已得出结果的记录（id），组内异常时其余记录才记为处理异常
+        self._settled = set()
+        self.contract_index = (
+            ContractIndex(logger, owner=username) if prefetch_index else None
+        )
+        # 下拉框可选项，填写表单时顺带读取，供下次运行的预检使用
+        self.option_cache = OptionCache(logger, owner=username)
+        self.resume = resume
+        self.journal = CheckpointJournal(CheckpointJournal.path_for(error_file), logger)
         self.all_data = []
         self.total = 0
+        self.pool = None
+        # 错误记录在多个工作线程之间共享，运行期间只追加，结束时统一生成Excel
+        self.error_sink = ErrorSink(error_file, logger)
+        # 步骤耗时在所有工作线程之间共享，结束时统一汇总
+        self.metrics = RunMetrics(logger)
+        # 错误截图由共享的后台线程写盘，记录循环只负责截取
+        self.screenshots = ScreenshotService(logger, screenshot_dir)
+        # 界面事件通道（EventBus），各工作线程的记录结果经此交给界面线程
+        self.events = None
+        self._current_contract = ""
+
+    def clone(self, worker_id):
+        """创建共享配置和错误记录、但拥有独立浏览器的处理器，供并发工作线程使用"""
+        worker = InvoiceProcessor(
+            excel_path=self.excel_path,
+            username=self.username,
+            password=self.password,
+            email=self.email,
+            error_file=self.error_file,
+            logger=self.logger,
+            screenshot_dir=self.screenshot_dir,
+            driver_path=self.driver_path,
+            http_mode=self.http_mode,
+            duplicate_policy=self.duplicate_policy,
+            lean_browser=self.lean_browser,
+            persist_session=self.persist_session,
+            worker_id=worker_id,
+        )
+        worker.contract_index = self.contract_index
+        worker.option_cache = self.option_cache
+        worker.journal = self.journal
+        worker.error_sink = self.error_sink
+        worker.metrics = self.metrics
+        worker.screenshots = self.screenshots
+        worker.events = self.events
+        worker.retry_policies = self.retry_policies
+        return worker
+
+    def profile_dir(self):
+        return os.path.join(CACHE_DIR, "chrome_profile", f"worker_{self.worker_id}")
+
+    @property
+    def wait(self):
+        """当前浏览器会话的条件等待引擎"""
+        return ElementWait(self.browser.driver)
+
+    @property
+    def contract_page(self):
+        """当前浏览器会话的合同页面对象（浏览器重启后重新创建）"""
+        if (
+            self._contract_page is None
+            or self._contract_page.driver is not self.browser.driver
+        ):
+            self._contract_page = ContractPage(self.browser.driver)
+        return self._contract_page
+
+    @property
+    def invoice_dialog(self):
+        """当前浏览器会话的「发票申请」对话框对象"""
+        if (
+            self._invoice_dialog is None
+            or self._invoice_dialog.driver is not self.browser.driver
+        ):
+            self._invoice_dialog = InvoiceDialog(
+                self.browser.driver, INVOICE_DIALOG_TITLE
+            )
+        return self._invoice_dialog
 
     def load_data(self):
-        """加载Excel数据"""
+        """加载Excel数据
+
+        只准备流式读取器，记录在处理时才逐行读取（仅合同编号、开票项目、开票金额三列）；
+        记录总数由预检时统计，不单独读一遍文件。
+        """
         if not ExcelHandler.file_exists(self.excel_path):
             raise FileNotFoundError(f"Excel文件不存在: {self.excel_path}")
 
-        self.all_data = ExcelHandler.read_excel(self.excel_path)
-        self.logger.info(f"成功加载Excel数据: {self.all_data}")
-        self.total = len(self.all_data)
-
-        if self.total == 0:
-            raise ValueError("Excel文件中没有数据")
-
-        self.logger.info(f"共加载{self.total}条记录")
+        self.all_data = ExcelHandler.iter_records(self.excel_path)
         return True
 
     def login(self) -> bool:
@@ -59,10 +232,8 @@ class InvoiceProcessor:
 
             self.logger.info("开始执行登录操作...")
             # 输入用户名和密码
-            username_input = WebDriverWait(self.browser.driver, 10).until(
-                EC.presence_of_element_located(
-                    (By.CSS_SELECTOR, 'input[placeholder="账号"]')
-                )
+            username_input = self.wait.present(
+                (By.CSS_SELECTOR, 'input[placeholder="账号"]')
             )
             self.logger.info("找到用户名输入框")
 
@@ -77,20 +248,60 @@ class InvoiceProcessor:
             self.logger.info("已输入密码")
 
             # 点击登录按钮
-            login_button = WebDriverWait(self.browser.driver, 10).until(
-                EC.element_to_be_clickable((By.CLASS_NAME, "login-submit"))
-            )
+            login_button = self.wait.clickable((By.CLASS_NAME, "login-submit"))
             self.logger.info("找到登录按钮")
             login_button.click()
             self.logger.info("已点击登录按钮，等待登录完成...")
 
-            time.sleep(2)
+            # 登录成功后账号输入框随登录页一起卸载
+            self.wait.until(
+                lambda driver: not driver.find_elements(
+                    By.CSS_SELECTOR, 'input[placeholder="账号"]'
+                ),
+                message="登录页未跳转",
+            )
             self.logger.success("登录成功")
             return True
         except Exception as e:
             self.logger.error(f"登录失败：{e}")
             return False
 
+    def restore_login(self) -> bool:
+        """尝试复用缓存的登录会话，有效时停留在待开班合同表页面"""
+        if not self.browser.driver:
+            return False
+        if not self.browser.restore_session(
+            SESSION_CACHE_PATH, os.getenv("CRM_URL") or "", owner=self.username
+        ):
+            # 没有会话缓存时，持久化浏览器目录中的Cookie也可能仍然有效
+            if not self.browser.profile_dir:
+                return False
+        return self.session_valid()
+
+    def session_valid(self) -> bool:
+        """打开合同页面，看最终出现的是合同表格还是登录页"""
+        try:
+            self.browser.driver.get(os.getenv("HETONG_URL") or "")
+            self.wait.until(
+                lambda driver: driver.find_elements(
+                    By.CSS_SELECTOR, 'input[placeholder="账号"]'
+                )
+                or driver.find_elements(By.CSS_SELECTOR, ".el-table"),
+                15,
+                "合同页面未加载",
+            )
+            if self.browser.driver.find_elements(
+                By.CSS_SELECTOR, 'input[placeholder="账号"]'
+            ):
+                self.logger.info("缓存的登录会话已失效，重新登录")
+                return False
+            self.wait.loading_finished(15)
+            self.logger.success("已复用缓存的登录会话，跳过登录")
+            return True
+        except Exception as e:
+            self.logger.warning(f"检查登录会话失败：{e}")
+            return False
+
     def navigate_to_contract_page(self) -> bool:
         try:
             if not self.browser.driver:
@@ -100,20 +311,41 @@ class InvoiceProcessor:
             self.logger.info("开始导航至待开班合同表页面...")
             target_url = os.getenv("HETONG_URL") or ""
             self.browser.driver.get(target_url)
+            self.contract_page.invalidate()
             self.logger.info(f"已直接访问待开班合同表页面：{target_url}")
 
-            WebDriverWait(self.browser.driver, 15).until(
-                EC.presence_of_element_located(
-                    (By.XPATH, '//div[contains(@class, "el-table")]')
-                )
-            )
+            self.wait.present((By.XPATH, '//div[contains(@class, "el-table")]'), 15)
+            self.wait.loading_finished(15)
             self.logger.info("待开班合同表页面加载完成")
-            time.sleep(1)
             return True
         except Exception as e:
             self.logger.error(f"直接访问待开班合同表失败：{e}")
             return False
 
+    def prefetch_contract_index(self, use_cache=True) -> bool:
+        """翻阅整张待开班合同表建立合同索引（当天缓存未过期时直接复用）"""
+        if not self.contract_index or self.contract_index.ready:
+            return True
+        if use_cache and self.contract_index.load_cache():
+            return True
+        if not self.browser.driver:
+            self.logger.error("浏览器驱动未初始化")
+            return False
+
+        self.logger.info("开始抓取待开班合同表建立合同索引...")
+        if not self.contract_index.build(self.browser.driver, self.wait):
+            return False
+        # 翻页后回到合同表首页，保证后续搜索从干净状态开始
+        return self.navigate_to_contract_page()
+
+    def _missing_from_index(self, contract_no) -> bool:
+        """合同索引已建立且不包含该合同时返回True"""
+        return bool(
+            self.contract_index
+            and self.contract_index.ready
+            and contract_no not in self.contract_index
+        )
+
     def search_contract(self, target_contract_no: str) -> bool:
         try:
             if not self.browser.driver:
@@ -121,49 +353,26 @@ class InvoiceProcessor:
                 return False
 
             self.logger.info(f"开始搜索合同编号: {target_contract_no}")
+            self.blocked_reason = ""
 
-            contract_no_form = WebDriverWait(self.browser.driver, 15).until(
-                EC.presence_of_element_located(
-                    (
-                        By.XPATH,
-                        '//div[@class="el-form-item el-form-item--small"][label[@class="el-form-item__label" and text()="合同编号"]]',
-                    )
-                )
-            )
-            contract_no_input = contract_no_form.find_element(
-                By.XPATH, './/input[@class="el-input__inner" and @placeholder="请输入"]'
-            )
-            contract_no_input.click()
-            contract_no_input.clear()
-            contract_no_input.send_keys(target_contract_no)
+            # 先记下表格当前状态，只接受点击搜索之后刷新出的结果
+            self.wait.watch_table_refresh()
+            # 合同编号输入框和搜索按钮在记录之间不变，由页面对象缓存句柄
+            self.contract_page.search(target_contract_no)
             self.logger.info(f"已输入合同编号：{target_contract_no}")
-
-            search_btn = WebDriverWait(self.browser.driver, 10).until(
-                EC.element_to_be_clickable(
-                    (
-                        By.XPATH,
-                        '//button[contains(@class, "submit-btn") and span[text()=" 搜索 "]]',
-                    )
-                )
-            )
-            self.browser.driver.execute_script("arguments[0].click();", search_btn)
             self.logger.info("已点击搜索按钮，等待搜索结果...")
-            time.sleep(2)
 
             try:
-                WebDriverWait(self.browser.driver, 10).until(
-                    EC.presence_of_element_located(
-                        (
-                            By.XPATH,
-                            '//div[@class="el-table__fixed-body-wrapper"]//tbody',
-                        )
-                    )
-                )
+                if self.wait.search_settled(target_contract_no) == "empty":
+                    self.logger.warning(f"合同编号 {target_contract_no} 搜索结果为空")
+                    self.blocked_reason = "搜索结果为空"
+                    return False
                 rows = self.browser.driver.find_elements(
                     By.XPATH, '//div[@class="el-table__fixed-body-wrapper"]//tbody/tr'
                 )
                 if len(rows) == 0 or (len(rows) == 1 and "暂无数据" in rows[0].text):
                     self.logger.warning(f"合同编号 {target_contract_no} 搜索结果为空")
+                    self.blocked_reason = "搜索结果为空"
                     return False
                 self.logger.info(f"合同编号 {target_contract_no} 找到{len(rows)}条数据")
                 return True
@@ -174,122 +383,124 @@ class InvoiceProcessor:
             self.logger.error(f"搜索合同失败：{e}")
             return False
 
-    def start_invoice_application(self):
+    def start_invoice_application(self, row_index=0):
+        """只勾选搜索结果中的指定行（上一轮残留的勾选一并取消）并打开「发票申请」对话框"""
         try:
             if not self.browser.driver:
                 self.logger.error("浏览器驱动未初始化")
                 return False
 
             self.logger.info("开始执行申请发票操作...")
-            fixed_table_rows = WebDriverWait(self.browser.driver, 15).until(
-                EC.presence_of_all_elements_located(
-                    (
-                        By.XPATH,
-                        '//div[@class="el-table__fixed"]//div[@class="el-table__fixed-body-wrapper"]//tbody/tr',
-                    )
-                )
+            fixed_table_rows = self.wait.all_present(
+                (
+                    By.XPATH,
+                    '//div[@class="el-table__fixed"]//div[@class="el-table__fixed-body-wrapper"]//tbody/tr',
+                ),
+                15,
             )
 
-            target_row_index = 0
-            if target_row_index >= len(fixed_table_rows):
+            if row_index >= len(fixed_table_rows):
                 raise Exception(
-                    f"目标行索引 {target_row_index} 超出实际数据行数 {len(fixed_table_rows)}"
+                    f"目标行索引 {row_index} 超出实际数据行数 {len(fixed_table_rows)}"
                 )
 
-            target_checkbox = fixed_table_rows[target_row_index].find_element(
-                By.XPATH,
-                './/label[@class="el-checkbox"]//span[@class="el-checkbox__input"]',
-            )
-
-            self.browser.driver.execute_script(
-                "arguments[0].scrollIntoView(true);", target_checkbox
-            )
-            time.sleep(0.5)
-
-            class_attr = target_checkbox.get_attribute("class")
-            if class_attr is None or "is-checked" not in class_attr:
-                try:
-                    target_checkbox.click()
-                except:
-                    self.browser.driver.execute_script(
-                        "arguments[0].click();", target_checkbox
-                    )
-                time.sleep(0.5)
-
-            if "is-checked" in (target_checkbox.get_attribute("class") or ""):
-                self.logger.info("✅ 固定列复选框已成功勾选")
-            else:
+            self.browser.driver.execute_script(_JS_SYNC_CHECKBOXES, row_index)
+            try:
+                self.wait.until(
+                    lambda driver: driver.execute_script(_JS_CHECKED_ROWS)
+                    == [row_index],
+                    3,
+                )
+                self.logger.info(f"✅ 固定列复选框已成功勾选：第{row_index + 1}行")
+            except Exception:
                 raise Exception("❌ 勾选失败，复选框仍未选中")
 
-            apply_btn = WebDriverWait(self.browser.driver, 15).until(
-                EC.element_to_be_clickable(
-                    (
-                        By.XPATH,
-                        '//div[@class="table-tools-btnList"]//button[contains(@class, "table-tools-btn") and span[text()=" 申请发票 "]]',
-                    )
-                )
-            )
             self.logger.info("开始点击「申请发票」按钮...")
-            self.browser.driver.execute_script(
-                "arguments[0].scrollIntoView(true);", apply_btn
-            )
-            time.sleep(0.5)
-            self.browser.driver.execute_script("arguments[0].click();", apply_btn)
+            self.wait.clear_messages()
+            self._with_retry("click", self.contract_page.click_apply)
             self.logger.info("已点击「申请发票」按钮")
-            time.sleep(1)
 
-            try:
-                message = WebDriverWait(self.browser.driver, 3).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "div.el-message"))
-                )
-                msg_text = message.find_element(
-                    By.CLASS_NAME, "el-message__content"
-                ).text.strip()
-                class_attr = message.get_attribute("class") or ""
-                if (
-                    "el-message--warning" in class_attr
-                    or "el-message--error" in class_attr
-                ):
-                    self.logger.warning(f"提交被拦截：{msg_text}")
-                    return False
-                else:
-                    self.logger.info(f"提示信息：{msg_text}")
-            except TimeoutException:
-                self.logger.info("未检测到任何提示，继续流程")
+            kind, payload = self.wait.dialog_or_message(INVOICE_DIALOG_TITLE)
+            if kind == "message":
+                self.logger.warning(f"提交被拦截：{payload['text']}")
+                self.blocked_reason = payload["text"]
+                return False
+            self.logger.info("「发票申请」对话框已打开")
             return True
         except Exception as e:
             self.logger.error(f"点击「申请发票」按钮失败：{e}")
             return False
 
     def fill_invoice_form(self, content, amount):
-        """填写发票表单"""
+        """填写发票表单：优先通过组件模型一次性填写，页面不支持时逐项点击填写"""
+        if self.js_form_fill:
+            try:
+                dialog = self.wait.dialog_open(INVOICE_DIALOG_TITLE)
+                values = {
+                    **INVOICE_FORM_DEFAULTS,
+                    "invoiceContext": content,
+                    "billMoney": amount,
+                    "invoiceEmail": self.email,
+                }
+                filler = DialogFormFiller(self.browser.driver, self.logger)
+                filled = self._timed(
+                    "fill_form",
+                    filler.fill,
+                    dialog,
+                    values,
+                    not self.option_cache.refreshed,
+                )
+                if filler.options:
+                    self.option_cache.update(filler.options)
+                if filled:
+                    return True
+                if filler.missing_options:
+                    self.blocked_reason = "下拉框中没有对应选项"
+                return False
+            except FormFillUnsupported as e:
+                self.logger.warning(f"无法通过组件模型填写表单（{e}），改为逐项填写")
+                self.js_form_fill = False
+            except Exception as e:
+                self.logger.error(f"填写发票表单失败：{e}")
+                return False
+
         try:
             # 选择发票类型
-            if not self._select_fapiao_type():
+            if not self._timed("field:invoiceGroup", self._select_fapiao_type):
                 return False
 
             # 选择发票抬头
-            if not self._select_invoice_type():
+            if not self._timed("field:invoiceType", self._select_invoice_type):
                 return False
 
             # 选择抬头类型
-            if not self._select_title_type():
+            if not self._timed("field:invoiceUpHeadType", self._select_title_type):
                 return False
 
             # 填写发票抬头
-            if not self._insert_fapiao_title():
+            if not self._timed("field:invoiceUpHead", self._insert_fapiao_title):
                 return False
 
-            # 填写发票内容
-            if not self._insert_fapiao_content(str(content)):
+            # 填写发票内容（顺带把读到的选项保存下来，供下次运行预检）
+            selected = self._timed(
+                "field:invoiceContext", self._insert_fapiao_content, str(content)
+            )
+            labels = self.invoice_dialog.option_labels("invoiceContext")
+            if labels and not self.option_cache.refreshed:
+                self.option_cache.update({"invoiceContext": labels})
+            if not selected:
                 return False
 
             # 填写发票金额
-            if not self._insert_fapiao_amount(str(amount)):
+            if not self._timed(
+                "field:billMoney", self._insert_fapiao_amount, str(amount)
+            ):
                 return False
 
             # 填写接收邮箱
-            if not self._insert_fapiao_email(self.email):
+            if not self._timed(
+                "field:invoiceEmail", self._insert_fapiao_email, self.email
+            ):
                 return False
 
             return True
@@ -298,6 +509,7 @@ class InvoiceProcessor:
             return False
 
     def submit_invoice(self):
+        clicked = False
         try:
             if not self.browser.driver:
                 self.logger.error("浏览器驱动未初始化")
@@ -306,20 +518,23 @@ class InvoiceProcessor:
             self.logger.info("开始提交发票申请...")
 
             # 点击提交按钮
-            ok_btn = WebDriverWait(self.browser.driver, 10).until(
-                EC.element_to_be_clickable(
-                    (
-                        By.XPATH,
-                        '//div[@aria-label="发票申请"]//div[@class="el-dialog__footer"]//button[contains(@class,"el-button--primary")]',
-                    )
-                )
-            )
-            self.browser.driver.execute_script("arguments[0].click();", ok_btn)
+            self.wait.clear_messages()
+            self._with_retry("click", self.invoice_dialog.submit)
+            clicked = True
             self.logger.info("已点击提交按钮")
-            time.sleep(2)
+
+            kind, payload = self.wait.closed_or_message(INVOICE_DIALOG_TITLE)
+            if kind == "message":
+                self.logger.warning(f"提交被拦截：{payload['text']}")
+                self.blocked_reason = payload["text"]
+                return False
+            self.wait.loading_finished()
             return True
         except Exception as e:
             self.logger.error(f"提交发票申请失败：{e}")
+            if clicked:
+                # 点击后申请可能已经提交，不再重试，避免重复申请
+                self.blocked_reason = "提交结果未确认"
             return False
 
     def _select_fapiao_type(self):
@@ -329,27 +544,15 @@ class InvoiceProcessor:
                 return False
 
             self.logger.info("开始选择发票类型...")
-            WebDriverWait(self.browser.driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "el-dialog__title"))
-            )
-            invoice_group_select = WebDriverWait(self.browser.driver, 10).until(
-                EC.element_to_be_clickable(
-                    (By.CSS_SELECTOR, "label[for='invoiceGroup'] + div .el-select")
-                )
+            self.wait.dialog_open(INVOICE_DIALOG_TITLE)
+            self._with_retry(
+                "field",
+                self.invoice_dialog.select,
+                "invoiceGroup",
+                "增值税普通发票",
+                recover=self.invoice_dialog.dismiss_dropdowns,
             )
-            invoice_group_select.click()
-            self.logger.info("已打开发票类型下拉框")
-
-            WebDriverWait(self.browser.driver, 10).until(
-                EC.element_to_be_clickable(
-                    (
-                        By.XPATH,
-                        "//li[contains(@class, 'el-select-dropdown__item')]/span[text()='增值税普通发票']",
-                    )
-                )
-            ).click()
             self.logger.info("已选择发票类型：增值税普通发票")
-            time.sleep(0.5)
             return True
         except Exception as e:
             self.logger.error(f"选择发票类型失败：{e}")
@@ -362,24 +565,14 @@ class InvoiceProcessor:
                 return False
 
             self.logger.info("开始选择发票抬头...")
-            invoice_type_select = WebDriverWait(self.browser.driver, 10).until(
-                EC.element_to_be_clickable(
-                    (By.CSS_SELECTOR, "label[for='invoiceType'] + div .el-select")
-                )
+            self._with_retry(
+                "field",
+                self.invoice_dialog.select,
+                "invoiceType",
+                "电子票",
+                recover=self.invoice_dialog.dismiss_dropdowns,
             )
-            invoice_type_select.click()
-            self.logger.info("已打开发票抬头下拉框")
-
-            WebDriverWait(self.browser.driver, 10).until(
-                EC.element_to_be_clickable(
-                    (
-                        By.XPATH,
-                        "//li[contains(@class, 'el-select-dropdown__item')]/span[text()='电子票']",
-                    )
-                )
-            ).click()
             self.logger.info("已选择发票抬头：电子票")
-            time.sleep(0.5)
             return True
         except Exception as e:
             self.logger.error(f"选择发票抬头失败：{e}")
@@ -392,24 +585,14 @@ class InvoiceProcessor:
                 return False
 
             self.logger.info("开始选择抬头类型...")
-            title_type_select = WebDriverWait(self.browser.driver, 10).until(
-                EC.element_to_be_clickable(
-                    (By.CSS_SELECTOR, "label[for='invoiceUpHeadType'] + div .el-select")
-                )
+            self._with_retry(
+                "field",
+                self.invoice_dialog.select,
+                "invoiceUpHeadType",
+                "个人",
+                recover=self.invoice_dialog.dismiss_dropdowns,
             )
-            title_type_select.click()
-            self.logger.info("已打开抬头类型下拉框")
-
-            WebDriverWait(self.browser.driver, 10).until(
-                EC.element_to_be_clickable(
-                    (
-                        By.XPATH,
-                        "//li[contains(@class, 'el-select-dropdown__item')]/span[text()='个人']",
-                    )
-                )
-            ).click()
             self.logger.info("已选择抬头类型：个人")
-            time.sleep(0.5)
             return True
         except Exception as e:
             self.logger.error(f"选择抬头类型失败：{e}")
@@ -422,18 +605,8 @@ class InvoiceProcessor:
                 return False
 
             self.logger.info("开始填写发票抬头...")
-            invoice_title_input = WebDriverWait(self.browser.driver, 10).until(
-                EC.element_to_be_clickable(
-                    (
-                        By.CSS_SELECTOR,
-                        "label[for='invoiceUpHead'] + div .el-input__inner",
-                    )
-                )
-            )
-            invoice_title_input.clear()
-            invoice_title_input.send_keys("个人")
+            self._with_retry("field", self.invoice_dialog.fill, "invoiceUpHead", "个人")
             self.logger.info("已填写发票抬头：个人")
-            time.sleep(0.5)
             return True
         except Exception as e:
             self.logger.error(f"填写发票抬头失败：{e}")
@@ -446,24 +619,14 @@ class InvoiceProcessor:
                 return False
 
             self.logger.info(f"开始填写发票内容：{content}")
-            invoice_content_select = WebDriverWait(self.browser.driver, 10).until(
-                EC.element_to_be_clickable(
-                    (By.CSS_SELECTOR, "label[for='invoiceContext'] + div .el-select")
-                )
+            self._with_retry(
+                "field",
+                self.invoice_dialog.select,
+                "invoiceContext",
+                content,
+                recover=self.invoice_dialog.dismiss_dropdowns,
             )
-            invoice_content_select.click()
-            self.logger.info("已打开发票内容下拉框")
-
-            WebDriverWait(self.browser.driver, 10).until(
-                EC.element_to_be_clickable(
-                    (
-                        By.XPATH,
-                        f"//li[contains(@class, 'el-select-dropdown__item')]/span[text()='{content}']",
-                    )
-                )
-            ).click()
             self.logger.info(f"已选择发票内容：{content}")
-            time.sleep(0.5)
             return True
         except Exception as e:
             self.logger.error(f"填写发票内容失败：{e}")
@@ -476,15 +639,8 @@ class InvoiceProcessor:
                 return False
 
             self.logger.info(f"开始填写发票金额：{amount}")
-            invoice_amount_input = WebDriverWait(self.browser.driver, 10).until(
-                EC.element_to_be_clickable(
-                    (By.CSS_SELECTOR, "label[for='billMoney'] + div .el-input__inner")
-                )
-            )
-            invoice_amount_input.clear()
-            invoice_amount_input.send_keys(amount)
+            self._with_retry("field", self.invoice_dialog.fill, "billMoney", amount)
             self.logger.info(f"已填写发票金额：{amount}")
-            time.sleep(0.5)
             return True
         except Exception as e:
             self.logger.error(f"填写发票金额失败：{e}")
@@ -497,159 +653,554 @@ class InvoiceProcessor:
                 return False
 
             self.logger.info(f"开始填写接收邮箱：{email}")
-            email_input = WebDriverWait(self.browser.driver, 10).until(
-                EC.element_to_be_clickable(
-                    (
-                        By.CSS_SELECTOR,
-                        "label[for='invoiceEmail'] + div .el-input__inner",
-                    )
-                )
-            )
-            email_input.clear()
-            email_input.send_keys(email)
+            self._with_retry("field", self.invoice_dialog.fill, "invoiceEmail", email)
             self.logger.info(f"已填写接收邮箱：{email}")
-            time.sleep(0.5)
             return True
         except Exception as e:
             self.logger.error(f"填写接收邮箱失败：{e}")
             return False
 
-    def process(self, progress_callback, stop_check, error_callback):
-        """处理发票申请的主流程"""
+    def _timed(self, step, func, *args):
+        """执行一个步骤并记录耗时，返回False或抛出异常均记为失败"""
+        start = time.perf_counter()
+        result = False
         try:
-            # 加载数据
-            self.load_data()
+            with self.logger.contextualize(step=step):
+                result = func(*args)
+            return result
+        finally:
+            self.metrics.add(
+                step,
+                time.perf_counter() - start,
+                ok=result is not False,
+                contract_no=self._current_contract,
+                worker=self.worker_id,
+            )
 
-            if not self.load_data():
-                error_callback("加载数据失败")
-                return
+    def progress_text(self, done):
+        return (
+            f"处理中: {done}/{self.total}（{self.metrics.throughput(done):.1f}条/分钟）"
+        )
 
-            # 初始化浏览器
-            if not self.browser.init_driver():
+    def prepare_browser(self, error_callback=None) -> bool:
+        """启动浏览器、登录并进入合同页面"""
+        if not self._timed("launch", self.browser.init_driver):
+            if error_callback:
                 error_callback("浏览器初始化失败")
-                return
+            return False
 
-            # 登录系统
-            if not self.login():
-                error_callback("登录失败")
-                if self.browser.driver:
-                    capture_screenshot(
-                        self.browser.driver, "login_failed", self.screenshot_dir
-                    )
-                return
+        # 缓存的会话有效时已经停留在合同页面，无需登录和导航
+        if not (
+            self.persist_session and self._timed("restore_session", self.restore_login)
+        ):
+            if not self._timed("login", self.login):
+                if error_callback:
+                    error_callback("登录失败")
+                self._capture("login_failed")
+                return False
 
-            # 导航到合同页面
-            if not self.navigate_to_contract_page():
-                error_callback("导航到合同页面失败")
-                if self.browser.driver:
-                    capture_screenshot(
-                        self.browser.driver, "navigate_failed", self.screenshot_dir
-                    )
-                return
+            if not self._timed("navigate", self.navigate_to_contract_page):
+                if error_callback:
+                    error_callback("导航到合同页面失败")
+                self._capture("navigate_failed")
+                return False
+
+            if self.persist_session:
+                self.browser.save_session(SESSION_CACHE_PATH, owner=self.username)
 
-            # 处理每个合同
-            for i, record in enumerate(self.all_data):
-                if not stop_check():
+        if self.http_mode:
+            try:
+                self.http = CrmHttpClient.from_driver(self.browser.driver, self.logger)
+            except Exception as e:
+                self.logger.warning(f"HTTP直连模式初始化失败，使用浏览器流程：{e}")
+                self.http = None
+
+        return True
+
+    def save_error(self, record, reason, screenshot_name=None, screenshot_path=""):
+        """保存错误记录，可选附带当前页面截图"""
+        if screenshot_name:
+            screenshot_path = self._capture(screenshot_name)
+        self._timed("error_write", self._write_error, record, reason, screenshot_path)
+
+    def _write_error(self, record, reason, screenshot_path):
+        self.error_sink.append(
+            {**record, "错误原因": reason, "截图路径": screenshot_path}
+        )
+        self._mark(record, CheckpointJournal.FAILED, reason)
+
+    def _mark(self, record, status, reason=""):
+        """记录最终结果：写入断点日志，并通知界面（如有）"""
+        self._settled.add(id(record))
+        self.journal.mark(record, status, reason)
+        self._publish_result(record, status == CheckpointJournal.SUCCESS, reason)
+
+    def _reject(self, record, reason):
+        """处理前即判定失败的记录：只写错误记录，不写断点日志
+
+        被拒绝的重复行与已提交的原行可能键相同，写入失败状态会导致续跑时重复提交。
+        """
+        self.error_sink.append({**record, "错误原因": reason, "截图路径": ""})
+        self._publish_result(record, False, reason)
+
+    def _publish_result(self, record, ok, reason=""):
+        if self.events:
+            self.events.publish(
+                RecordResult(str(record.get("合同编号") or ""), ok, reason)
+            )
+
+    def _capture(self, name):
+        if not self.browser.driver:
+            return ""
+        return self._timed(
+            "screenshot", self.screenshots.capture, self.browser.driver, name
+        )
+
+    def process_record(self, record, index) -> bool:
+        """处理单条记录：搜索 → 申请 → 填写 → 提交"""
+        contract_no = record.get("合同编号")
+
+        if not contract_no:
+            self.logger.warning("跳过缺少合同编号的记录")
+            self.save_error(record, "缺少合同编号")
+            return False
+
+        self.logger.info(
+            f"\n===== 开始处理第{index+1}条记录: 合同编号 {contract_no} ====="
+        )
+        self._current_contract = contract_no
+
+        if self._missing_from_index(contract_no):
+            self.logger.warning(f"合同 {contract_no} 不在合同索引中，添加到错误记录")
+            self.save_error(record, "合同未找到")
+            return False
+
+        if self.http:
+            result = self._process_record_http(record)
+            if result is not None:
+                return result
+
+        # 搜索合同
+        if not self._search_with_retry(contract_no):
+            self.logger.warning(f"合同 {contract_no} 未找到，添加到错误记录")
+            self.save_error(record, "合同未找到", contract_no)
+            return False
+
+        return self._apply_record(record, contract_no)
+
+    def _apply_record(self, record, contract_no, row_index=0) -> bool:
+        """在当前搜索结果上完成一轮 申请 → 填写 → 提交
+
+        瞬时失败时关闭对话框重新勾选并打开（搜索结果已变化时先重新搜索），
+        页面给出明确结论的失败直接写入错误记录。
+        """
+        policy = self.retry_policies["dialog"]
+        for attempt in range(1, policy.attempts + 1):
+            reason = self._apply_once(record, contract_no, row_index)
+            if reason is None:
+                self.logger.success(f"合同 {contract_no} 处理成功")
+                self._mark(record, CheckpointJournal.SUCCESS)
+                return True
+            if self.blocked_reason or attempt >= policy.attempts:
+                break
+
+            self._close_invoice_dialog()
+            self._note_retry("dialog", attempt, reason)
+            time.sleep(policy.delay(attempt))
+            if not self._results_intact(contract_no, row_index):
+                self.logger.info(f"搜索结果已变化，重新搜索合同 {contract_no}")
+                if not self._search_with_retry(contract_no):
+                    reason = "合同未找到"
                     break
 
-                # 更新进度
-                progress = (i + 1) / self.total * 100
-                progress_callback(progress, f"处理中: {i+1}/{self.total}")
+        self.save_error(record, reason, contract_no)
+        self._close_invoice_dialog()
+        return False
+
+    def _apply_once(self, record, contract_no, row_index):
+        """执行一轮 申请 → 填写 → 提交，成功返回None，失败返回错误原因"""
+        invoice_content = record.get("开票项目")
+        amount = record.get("开票金额")
+        self.blocked_reason = ""
+
+        # 申请发票
+        if not self._timed("apply", self.start_invoice_application, row_index):
+            self.logger.warning(f"合同 {contract_no} 申请发票失败")
+            return "申请发票失败"
+
+        # 填写发票表单
+        if not self.fill_invoice_form(invoice_content, amount):
+            self.logger.warning(f"合同 {contract_no} 填写发票表单失败")
+            return "填写发票表单失败"
+
+        # 提交申请
+        if not self._timed("submit", self.submit_invoice):
+            self.logger.warning(f"合同 {contract_no} 提交申请失败")
+            return "提交申请失败"
+        return None
+
+    def _search_with_retry(self, contract_no) -> bool:
+        """搜索合同；结果为空直接返回，其它失败按策略重试，合同页面异常时先重新进入"""
+        policy = self.retry_policies["search"]
+        for attempt in range(1, policy.attempts + 1):
+            if self._timed("search", self.search_contract, contract_no):
+                return True
+            if self.blocked_reason or attempt >= policy.attempts:
+                return False
+            self._note_retry("search", attempt, "搜索未完成")
+            time.sleep(policy.delay(attempt))
+            if not self.browser.driver.find_elements(By.CSS_SELECTOR, ".el-table"):
+                self.navigate_to_contract_page()
+        return False
+
+    def _results_intact(self, contract_no, row_index) -> bool:
+        """当前结果表中目标行的合同编号是否仍与该合同完全一致"""
+        try:
+            matched = self.browser.driver.execute_script(
+                _JS_MATCHING_ROWS, str(contract_no)
+            )
+            return row_index in (matched or [])
+        except Exception:
+            return False
+
+    def _locate_row(self, contract_no):
+        """在当前搜索结果中定位合同编号完全一致的唯一一行
+
+        Returns:
+            (行索引, None)，无法确定时返回 (None, 错误原因)
+        """
+        matched = self.browser.driver.execute_script(
+            _JS_MATCHING_ROWS, str(contract_no)
+        )
+        if matched is None:
+            return None, "合同表格缺少「合同编号」列"
+        if not matched:
+            return None, "合同未找到（搜索结果编号不一致）"
+        if len(matched) > 1:
+            return (
+                None,
+                f"搜索结果中有{len(matched)}条编号相同的合同，无法确定申请哪一条",
+            )
+        return matched[0], None
+
+    def _with_retry(self, step, func, *args, recover=None):
+        """按步骤的重试策略执行页面动作，recover 在重试前恢复页面状态"""
+
+        def on_retry(attempt, error):
+            self._note_retry(step, attempt, type(error).__name__)
+            if recover:
+                recover()
+
+        try:
+            return self.retry_policies[step].call(func, *args, on_retry=on_retry)
+        except OptionNotFound:
+            # 页面上确实没有该选项，重试或重新打开对话框都无济于事
+            self.blocked_reason = "下拉框中没有对应选项"
+            raise
+
+    def _note_retry(self, step, attempt, reason):
+        """重试计入运行报告"""
+        self.metrics.count(f"retry:{step}")
+        self.logger.warning(f"{step}第{attempt}次失败（{reason}），重试")
+
+    def _close_invoice_dialog(self):
+        """失败后关闭残留的「发票申请」对话框，避免遮挡下一轮操作"""
+        try:
+            if self.invoice_dialog.close():
+                self.wait.dialog_closed(INVOICE_DIALOG_TITLE, 3)
+        except Exception as e:
+            self.logger.warning(f"关闭发票申请对话框失败：{e}")
+
+    def process_group(self, items) -> int:
+        """处理同一合同编号的一组记录：只搜索一次，在同一结果表上逐轮勾选并申请
 
-                # 获取合同信息
-                contract_no = record.get("合同编号")
-                invoice_content = record.get("开票项目")
-                amount = record.get("开票金额")
+        Args:
+            items: [(记录序号, 记录), ...]
 
-                if not contract_no:
-                    self.logger.warning("跳过缺少合同编号的记录")
-                    ExcelHandler.save_error_records(
-                        {**record, "错误原因": "缺少合同编号"}, self.error_file
-                    )
-                    continue
+        Returns:
+            成功处理的记录数
 
-                self.logger.info(
-                    f"\n===== 开始处理第{i+1}条记录: 合同编号 {contract_no} ====="
+        未预料的异常只影响本组：尚未得出结果的记录记为「处理异常」，串行和并发模式都继续处理下一组。
+        """
+        contract_no = items[0][1].get("合同编号")
+        self._settled = set()
+        # 本组内的日志都带上工作线程和合同编号，无需在每条消息里拼接
+        with self.logger.contextualize(
+            worker=self.worker_id, contract=contract_no or "-"
+        ):
+            try:
+                return self._process_group(items, contract_no)
+            except Exception as e:
+                self.logger.error(f"处理第{items[0][0] + 1}条记录出错: {e}")
+                for _, record in items:
+                    if id(record) not in self._settled:
+                        self.save_error(record, "处理异常")
+                return 0
+
+    def _process_group(self, items, contract_no) -> int:
+        if len(items) == 1 or self.http or self._missing_from_index(contract_no):
+            return sum(
+                1
+                for index, record in items
+                if self._timed("record", self.process_record, record, index)
+            )
+
+        self.logger.info(
+            f"\n===== 批量处理合同编号 {contract_no}：共{len(items)}条记录 ====="
+        )
+
+        self._current_contract = contract_no
+        if not self._search_with_retry(contract_no):
+            self.logger.warning(
+                f"合同 {contract_no} 未找到，{len(items)}条记录添加到错误记录"
+            )
+            screenshot_path = self._capture(contract_no)
+            for _, record in items:
+                self.save_error(record, "合同未找到", screenshot_path=screenshot_path)
+            return 0
+
+        # 所有记录都在编号完全一致的那一行上申请；提交后表格会重新加载，每轮前重新定位
+        succeeded = 0
+        for k, (index, record) in enumerate(items):
+            self.logger.info(f"批量第{k + 1}/{len(items)}轮：第{index + 1}条记录")
+            row_index, reason = self._locate_row(contract_no)
+            if reason and k > 0 and self._search_with_retry(contract_no):
+                row_index, reason = self._locate_row(contract_no)
+            if reason:
+                remaining = items[k:]
+                self.logger.warning(
+                    f"合同 {contract_no} {reason}，{len(remaining)}条记录添加到错误记录"
                 )
+                screenshot_path = self._capture(contract_no)
+                for _, rest in remaining:
+                    self.save_error(rest, reason, screenshot_path=screenshot_path)
+                break
+            if self._timed(
+                "record", self._apply_record, record, contract_no, row_index
+            ):
+                succeeded += 1
+        return succeeded
+
+    def group_records(self, records):
+        """按重复合同处理策略把记录组织为工作单元，被拒绝的记录直接写入错误记录
+
+        keep 策略下逐条惰性产出，不会提前读完整个输入。
+        """
+        planner = RunPlanner(self.logger, self.duplicate_policy)
+        groups = planner.plan(records, self.total, self.duplicate_contracts)
+        for record, reason in planner.rejected:
+            self._reject(record, reason)
+        self.total -= len(planner.rejected)
+        return groups
+
+    def _process_record_http(self, record):
+        """通过后端接口处理单条记录
+
+        搜索失败或申请请求未发出时返回None，由调用方回退到浏览器流程；
+        申请请求发出后结果未知时记为错误，不再回退，避免重复申请。
+        """
+        contract_no = str(record.get("合同编号"))
+        try:
+            rows = self.http.search_contract(contract_no)
+        except (HttpEngineError, CrmBusinessError) as e:
+            self.logger.warning(f"合同 {contract_no} HTTP搜索失败，回退浏览器流程：{e}")
+            return None
+
+        if not rows:
+            self.logger.warning(f"合同 {contract_no} 未找到，添加到错误记录")
+            self.save_error(record, "合同未找到")
+            return False
 
-                # 搜索合同
-                if not self.search_contract(contract_no):
-                    self.logger.warning(f"合同 {contract_no} 未找到，添加到错误记录")
-                    if self.browser.driver:
-                        screenshot_path = capture_screenshot(
-                            self.browser.driver, contract_no, self.screenshot_dir
-                        )
-                    ExcelHandler.save_error_records(
-                        {
-                            **record,
-                            "错误原因": "合同未找到",
-                            "截图路径": screenshot_path,
-                        },
-                        self.error_file,
-                    )
-                    continue
-
-                # 申请发票
-                if not self.start_invoice_application():
-                    self.logger.warning(f"合同 {contract_no} 申请发票失败")
-                    if self.browser.driver:
-                        screenshot_path = capture_screenshot(
-                            self.browser.driver, contract_no, self.screenshot_dir
-                        )
-                    ExcelHandler.save_error_records(
-                        {
-                            **record,
-                            "错误原因": "申请发票失败",
-                            "截图路径": screenshot_path,
-                        },
-                        self.error_file,
-                    )
-                    continue
-
-                # 填写发票表单
-                if not self.fill_invoice_form(invoice_content, amount):
-                    self.logger.warning(f"合同 {contract_no} 填写发票表单失败")
-                    if self.browser.driver:
-                        screenshot_path = capture_screenshot(
-                            self.browser.driver, contract_no, self.screenshot_dir
-                        )
-                    ExcelHandler.save_error_records(
-                        {
-                            **record,
-                            "错误原因": "填写发票表单失败",
-                            "截图路径": screenshot_path,
-                        },
-                        self.error_file,
-                    )
-                    continue
-
-                # 提交申请
-                if not self.submit_invoice():
-                    self.logger.warning(f"合同 {contract_no} 提交申请失败")
-                    if self.browser.driver:
-                        screenshot_path = capture_screenshot(
-                            self.browser.driver, contract_no, self.screenshot_dir
-                        )
-                    ExcelHandler.save_error_records(
-                        {
-                            **record,
-                            "错误原因": "提交申请失败",
-                            "截图路径": screenshot_path,
-                        },
-                        self.error_file,
-                    )
-                    continue
+        # 搜索为模糊匹配，没有编号完全一致的行时不猜测，避免申请到其他合同上
+        contract = next(
+            (row for row in rows if str(row.get("contractNo")) == contract_no), None
+        )
+        if contract is None:
+            self.logger.warning(
+                f"合同 {contract_no} 搜索结果中没有编号完全一致的合同，添加到错误记录"
+            )
+            self.save_error(record, "合同未找到（搜索结果编号不一致）")
+            return False
 
-                self.logger.success(f"合同 {contract_no} 处理成功")
-                time.sleep(2)  # 处理间隔
+        try:
+            ok, message = self.http.apply_invoice(
+                contract,
+                str(record.get("开票项目")),
+                record.get("开票金额"),
+                self.email,
+            )
+        except RequestNotSentError as e:
+            self.logger.warning(
+                f"合同 {contract_no} 申请请求未发出，回退浏览器流程：{e}"
+            )
+            return None
+        except SubmitUnconfirmedError as e:
+            self.logger.error(f"合同 {contract_no} 提交结果未确认，不再重试：{e}")
+            self.save_error(record, "提交结果未确认")
+            return False
+
+        if not ok:
+            self.logger.warning(f"合同 {contract_no} 申请被拦截：{message}")
+            self.save_error(record, f"申请发票失败：{message}")
+            return False
+
+        self.logger.success(f"合同 {contract_no} 处理成功（HTTP）")
+        self._mark(record, CheckpointJournal.SUCCESS)
+        return True
+
+    def _open_session(self, error_callback) -> bool:
+        """启动浏览器、登录并准备合同索引"""
+        if not self.prepare_browser(error_callback):
+            return False
+        if not self._timed("prefetch_index", self.prefetch_contract_index):
+            self.logger.warning("合同索引不可用，逐条搜索合同")
+        return True
+
+    def _build_shared_index(self, error_callback):
+        """并发模式下合同索引只需建立一次，由主会话抓取后共享给所有工作线程"""
+        if not self.contract_index or self.contract_index.load_cache():
+            return
+        try:
+            if self.prepare_browser(error_callback):
+                self._timed("prefetch_index", self.prefetch_contract_index, False)
+        finally:
+            self.browser.quit()
+
+    def _load_input(self, progress_callback) -> bool:
+        """读取并校验Excel数据；断点续跑时跳过上次运行中已成功提交的记录
+
+        读取失败时抛出异常，由调用方按运行出错处理。
+        """
+        try:
+            self.load_data()
+        except Exception as e:
+            self.logger.error(f"加载数据失败：{e}")
+            raise
+
+        self.journal.open(resume=self.resume)
+        self.error_sink.open()
+        if not self._timed("preflight", self._preflight):
+            progress_callback(100, "没有通过预检的记录")
+            return False
+        if self.resume:
+            pending, skipped = [], 0
+            for record in self.all_data:
+                if self.journal.is_done(record):
+                    skipped += 1
+                else:
+                    pending.append(record)
+            self.all_data, self.total = pending, len(pending)
+            self.logger.info(f"断点续跑：跳过{skipped}条已提交记录，剩余{self.total}条")
+            if self.total == 0:
+                progress_callback(100, "所有记录均已提交")
+                return False
+        self.groups = self.group_records(self.all_data)
+        return True
+
+    def _preflight(self) -> bool:
+        """整批校验输入并统计记录总数，未通过的记录直接写入错误记录，之后的处理流程只读到通过的记录"""
+        self.option_cache.load_cache()
+        validator = PreflightValidator(
+            self.logger, self.option_cache.get("invoiceContext")
+        )
+        try:
+            invalid = validator.validate(ExcelHandler.iter_records(self.excel_path))
+            self.total = validator.total
+            self.duplicate_contracts = validator.duplicate_contracts
+        except Exception as e:
+            # 预检只是提前筛掉必然失败的记录，出错时按原流程逐条处理
+            self.logger.warning(f"预检失败，跳过预检：{e}")
+            invalid = {}
+            self.total = ExcelHandler.count_rows(self.excel_path)
+
+        if self.total == 0:
+            self.logger.error("加载数据失败：Excel文件中没有数据")
+            raise ValueError("Excel文件中没有数据")
+        self.logger.info(f"共加载{self.total}条记录")
+        if not invalid:
+            return True
 
-            # 保存错误记录
-            if os.path.exists(self.error_file) and os.path.getsize(self.error_file) > 0:
-                self.logger.warning(f"有错误记录已保存至: {self.error_file}")
+        for record, reason in invalid.values():
+            self._reject(record, reason)
+        self.all_data = (
+            record
+            for position, record in enumerate(self.all_data)
+            if position not in invalid
+        )
+        self.total -= len(invalid)
+        return self.total > 0
+
+    def process(self, progress_callback, stop_check, error_callback):
+        """处理发票申请的主流程
+
+        浏览器启动和登录需要数秒，放到后台线程与Excel读取、校验并行进行，
+        数据准备好后等待会话就绪即开始提交。
+        """
+        startup = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="browser-startup"
+        )
+        self.metrics.open()
+        self.screenshots.start()
+        try:
+            if self.workers > 1:
+                # 并发模式：各工作线程立即开始独立登录，主会话同时按需抓取合同索引
+                self.pool = WorkerPool(self, self.workers, self.logger)
+                self.pool.start(progress_callback, stop_check)
+                session_ready = startup.submit(self._build_shared_index, error_callback)
+            else:
+                session_ready = startup.submit(self._open_session, error_callback)
+
+            if not self._load_input(progress_callback):
+                return
+
+            if self.workers > 1:
+                session_ready.result()
+                self.pool.run(
+                    self.groups,
+                    self.total,
+                    progress_callback,
+                    stop_check,
+                    error_callback,
+                )
+            else:
+                if not session_ready.result():
+                    return
+
+                # 处理每个合同（merge 策略下同一合同的多条记录只搜索一次）
+                done = 0
+                for items in self.groups:
+                    if not stop_check():
+                        break
+
+                    # 更新进度
+                    done += len(items)
+                    progress = min(done / self.total * 100, 100)
+                    progress_callback(progress, self.progress_text(done))
+
+                    self.process_group(items)
 
         finally:
+            # 等后台启动结束再退出浏览器，避免留下启动到一半的Chrome进程
+            startup.shutdown(wait=True)
+            if self.pool:
+                self.pool.shutdown()
+            if self.http:
+                self.http.close()
+            self.journal.close()
             self.browser.quit()
+            # 等待排队中的截图写盘完毕，错误记录中的截图路径才都有对应文件
+            self.screenshots.close()
+
+            # 保存错误记录（运行中只追加到预写文件，此处统一合并生成Excel）
+            self.error_sink.close()
+            if self.error_sink.written:
+                self.logger.warning(
+                    f"共{self.error_sink.written}条错误记录已保存至: {self.error_file}"
+                )
+            self.metrics.close()
 
     def stop(self):
         """停止处理并清理资源"""
+        if self.pool:
+            self.pool.stop()
         self.browser.quit()
@@ -0,0 +1,88 @@
+import json
+import os
+import threading
+import time
+
+
+class OptionCache:
+    """发票申请对话框各下拉框的可选项：字段名 → 选项文本列表
+
+    一次性填写表单时顺带读取，保存到磁盘供下次运行的预检使用；
+    超过TTL（默认7天，环境变量 OPTION_CACHE_TTL 可覆盖）或来自其他合同表地址、其他账号的缓存不再用于校验。
+    """
+
+    def __init__(self, logger, cache_path=None, ttl=None, url=None, owner=""):
+        self.logger = logger
+        self.cache_path = cache_path or self.default_cache_path()
+        # 缓存来源：合同表地址和登录账号，不一致的缓存不复用
+        self.url = url if url is not None else os.getenv("HETONG_URL") or ""
+        self.owner = owner
+        self.ttl = (
+            ttl
+            if ttl is not None
+            else int(os.getenv("OPTION_CACHE_TTL") or 7 * 24 * 3600)
+        )
+        self.options = {}
+        # 本次运行是否已从页面读取过，读取一次即可
+        self.refreshed = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def default_cache_path():
+        """缓存文件保存到与src同级的cache文件夹"""
+        current_path = os.path.abspath(__file__)
+        root_dir = os.path.dirname(os.path.dirname(os.path.dirname(current_path)))
+        return os.path.join(root_dir, "cache", "invoice_options.json")
+
+    def get(self, prop):
+        """某个下拉框的可选项，未知时返回None"""
+        return self.options.get(prop)
+
+    def load_cache(self) -> bool:
+        """读取未过期的磁盘缓存"""
+        try:
+            if not os.path.exists(self.cache_path):
+                return False
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            if cache.get("url") != self.url or cache.get("owner") != self.owner:
+                self.logger.info(
+                    "下拉选项缓存来自其他合同表地址或账号，本次不做选项校验"
+                )
+                return False
+            age = time.time() - cache.get("created_at", 0)
+            if age > self.ttl:
+                self.logger.info(
+                    f"下拉选项缓存已过期（{int(age)}秒前生成），本次不做选项校验"
+                )
+                return False
+            self.options = cache.get("options", {})
+            return True
+        except Exception as e:
+            self.logger.warning(f"读取下拉选项缓存失败：{e}")
+            return False
+
+    def update(self, options):
+        """用页面上读取到的选项更新缓存并落盘（每次运行一次，同时刷新缓存时间）"""
+        with self._lock:
+            self.refreshed = True
+            self.options = {**self.options, **options}
+            try:
+                os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+                tmp_path = self.cache_path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(
+                        {
+                            "created_at": time.time(),
+                            "url": self.url,
+                            "owner": self.owner,
+                            "options": self.options,
+                        },
+                        f,
+                        ensure_ascii=False,
+                    )
+                os.replace(tmp_path, self.cache_path)
+                counts = {prop: len(items) for prop, items in options.items()}
+                self.logger.info(f"已更新下拉选项缓存：{counts}")
+            except Exception as e:
+                self.logger.warning(f"保存下拉选项缓存失败：{e}")
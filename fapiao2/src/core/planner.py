@@ -0,0 +1,62 @@
+class RunPlanner:
+    """执行计划：按策略处理同一合同编号的多行记录，并把记录组织为工作单元
+
+    策略：
+        keep   逐条处理，保持文件顺序（不预读整个输入）
+        merge  同一合同编号的记录合为一组，只搜索一次，在同一结果表上逐轮申请
+        reject 同一合同编号只处理第一条，其余直接记为错误
+    """
+
+    POLICIES = {
+        "keep": "逐条处理",
+        "merge": "同合同合为一组",
+        "reject": "只保留第一条",
+    }
+
+    def __init__(self, logger, policy="keep"):
+        if policy not in self.POLICIES:
+            raise ValueError(f"未知的重复合同处理策略: {policy}")
+        self.logger = logger
+        self.policy = policy
+        # reject 策略下被拒绝的记录 [(记录, 原因), ...]
+        self.rejected = []
+
+    def plan(self, records, total, duplicate_contracts=0):
+        """返回工作单元 [(记录序号, 记录), ...] 的可迭代对象，并输出计划摘要
+
+        Args:
+            total: 记录数，用于计划摘要
+            duplicate_contracts: 预检统计的重复合同编号数，keep 策略下用于提示
+        """
+        self.rejected = []
+        if self.policy == "keep":
+            message = f"执行计划：{self.POLICIES['keep']}{total}条记录"
+            if duplicate_contracts:
+                self.logger.warning(
+                    f"{message}；{duplicate_contracts}个合同编号出现多次，逐条处理时重复申请可能被系统拦截，"
+                    "可改用「同合同合为一组」或「只保留第一条」"
+                )
+            else:
+                self.logger.info(message)
+            return ([(index, record)] for index, record in enumerate(records))
+
+        groups = {}
+        for index, record in enumerate(records):
+            contract_no = record.get("合同编号")
+            key = contract_no if contract_no else ("__missing__", index)
+            if key in groups and self.policy == "reject":
+                self.rejected.append((record, "合同编号重复（只处理第一条）"))
+                continue
+            groups.setdefault(key, []).append((index, record))
+        # 保持每个合同首次出现的顺序
+        planned = list(groups.values())
+
+        summary = f"执行计划（{self.POLICIES[self.policy]}）：{total}条记录 → {len(planned)}个合同，需搜索{len(planned)}次"
+        if self.policy == "merge":
+            summary += (
+                f"，最多一个合同{max((len(items) for items in planned), default=0)}条"
+            )
+        if self.rejected:
+            summary += f"，拒绝重复记录{len(self.rejected)}条"
+        self.logger.info(summary)
+        return planned
@@ -0,0 +1,81 @@
+from collections import Counter
+
+import pandas as pd
+
+from src.core.pages import normalize_option
+from src.utils.excel_handler import RECORD_COLUMNS
+
+
+class PreflightValidator:
+    """启动浏览器流程之前对整批记录做一次向量化校验
+
+    检查必填项、金额类型和范围、完全重复的行，以及开票项目是否在下拉框可选项中
+    （可选项来自上次运行缓存的列表，没有缓存时跳过该项）。
+    每行只记录第一个不通过的原因。
+    """
+
+    def __init__(self, logger, valid_contents=None):
+        self.logger = logger
+        self.valid_contents = (
+            {normalize_option(item) for item in valid_contents}
+            if valid_contents
+            else None
+        )
+        # 通过校验的记录中出现多次的合同编号个数，供执行计划提示
+        self.duplicate_contracts = 0
+        # 校验过的记录总数，预检已读完整个输入，调用方不必再单独计数
+        self.total = 0
+
+    def validate(self, records):
+        """返回未通过的记录 {行序号: (记录, 错误原因)}，行序号与 ExcelHandler.iter_records 的产出顺序一致"""
+        df = pd.DataFrame.from_records(records, columns=list(RECORD_COLUMNS))
+        self.duplicate_contracts = 0
+        self.total = len(df)
+        if df.empty:
+            return {}
+
+        reasons = pd.Series("", index=df.index, dtype=object)
+
+        def flag(mask, reason):
+            reasons[mask & (reasons == "")] = reason
+
+        flag(df["合同编号"].isna(), "缺少合同编号")
+        flag(df["开票项目"].isna(), "缺少开票项目")
+
+        amount = pd.to_numeric(df["开票金额"], errors="coerce")
+        flag(df["开票金额"].isna(), "缺少开票金额")
+        flag(amount.isna(), "开票金额不是有效数字")
+        flag(amount <= 0, "开票金额必须大于0")
+
+        if self.valid_contents:
+            flag(
+                df["开票项目"].notna()
+                & ~df["开票项目"]
+                .map(normalize_option, na_action="ignore")
+                .isin(self.valid_contents),
+                "开票项目不在可选列表中",
+            )
+
+        # 完全相同的行只保留第一条，避免对同一合同重复申请同一张发票
+        flag(df.duplicated(keep="first"), "重复记录")
+
+        contracts = df.loc[reasons == "", "合同编号"]
+        self.duplicate_contracts = int((contracts.value_counts() > 1).sum())
+
+        invalid = reasons[reasons != ""]
+        if not len(invalid):
+            self.logger.info(f"预检：{len(df)}条记录全部通过校验")
+            return {}
+
+        counts = "，".join(
+            f"{reason}：{count}条" for reason, count in Counter(invalid).items()
+        )
+        self.logger.warning(
+            f"预检：{len(invalid)}/{len(df)}条记录未通过校验（{counts}）"
+        )
+        rows = df.loc[invalid.index].astype(object)
+        rows = rows.where(rows.notna(), None).to_dict("records")
+        return {
+            position: (record, reason)
+            for position, record, reason in zip(invalid.index, rows, invalid)
+        }
@@ -0,0 +1,79 @@
+import time
+
+from selenium.common import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    JavascriptException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+
+# 页面渲染慢、遮罩未消失、元素被重新渲染等瞬时问题，重试通常即可恢复
+TRANSIENT_ERRORS = (
+    TimeoutException,
+    StaleElementReferenceException,
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    NoSuchElementException,
+    JavascriptException,
+)
+
+# 点击动作本身失败时页面状态未改变，可以安全重试；点击后的等待超时不在此列，避免重复提交
+CLICK_ERRORS = (
+    StaleElementReferenceException,
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+)
+
+
+class RetryPolicy:
+    """单个步骤的重试策略：最多尝试次数、指数退避间隔和可重试的异常类型"""
+
+    def __init__(
+        self,
+        attempts=3,
+        backoff=0.2,
+        factor=2.0,
+        max_backoff=2.0,
+        retry_on=TRANSIENT_ERRORS,
+    ):
+        self.attempts = max(1, attempts)
+        self.backoff = backoff
+        self.factor = factor
+        self.max_backoff = max_backoff
+        self.retry_on = retry_on
+
+    def delay(self, attempt):
+        """第 attempt 次失败后的等待秒数"""
+        return min(self.backoff * self.factor ** (attempt - 1), self.max_backoff)
+
+    def call(self, func, *args, on_retry=None):
+        """执行 func，抛出可重试异常时退避后重试，用尽次数后抛出最后一次的异常
+
+        Args:
+            on_retry: 每次重试前调用 on_retry(已失败次数, 异常)，用于计数和恢复页面状态
+        """
+        for attempt in range(1, self.attempts + 1):
+            try:
+                return func(*args)
+            except self.retry_on as e:
+                if attempt >= self.attempts:
+                    raise
+                if on_retry:
+                    on_retry(attempt, e)
+                time.sleep(self.delay(attempt))
+
+
+def default_policies():
+    """各步骤的默认重试策略"""
+    return {
+        # 单个表单项：收起下拉框后只重新操作该项
+        "field": RetryPolicy(attempts=3, backoff=0.2),
+        # 申请、提交等按钮的点击动作
+        "click": RetryPolicy(attempts=3, backoff=0.2, retry_on=CLICK_ERRORS),
+        # 整个对话框：关闭后重新勾选并打开，结果表已变化时先重新搜索
+        "dialog": RetryPolicy(attempts=2, backoff=0.5),
+        # 搜索：合同页面异常时先重新进入合同页面
+        "search": RetryPolicy(attempts=2, backoff=0.5),
+    }
@@ -0,0 +1,131 @@
+import queue
+import threading
+
+
+class WorkerPool:
+    """多浏览器并发处理池
+
+    每个工作线程持有一个独立的Chrome会话（登录 → 导航），
+    然后从共享队列中领取记录依次执行 搜索 → 申请 → 填写 → 提交。
+    记录由调用线程从（可能是流式的）输入中逐个放入有界队列，不必一次性读入内存。
+    可以先调用 start() 让各会话在后台启动登录，同时调用线程读取输入，再调用 run() 投放记录。
+    """
+
+    def __init__(self, processor, workers, logger):
+        self.processor = processor
+        self.workers = workers
+        self.logger = logger
+        self.sessions = []
+        self.threads = []
+        self.tasks = None
+        self._lock = threading.Lock()
+        self._done = 0
+        self._total = 0
+        self._alive = 0
+        self._feeding = False
+        self._unfed = False
+
+    def start(self, progress_callback, stop_check, worker_count=None):
+        """启动工作线程；各会话先启动浏览器并登录，然后等待 run() 投放记录"""
+        worker_count = worker_count or self.workers
+        self.logger.info(f"启动{worker_count}个并发浏览器会话")
+
+        self.tasks = queue.Queue(maxsize=worker_count * 4)
+        self._alive = worker_count
+        self._feeding = True
+        self._unfed = False
+
+        for worker_id in range(1, worker_count + 1):
+            session = self.processor.clone(worker_id)
+            self.sessions.append(session)
+            thread = threading.Thread(
+                target=self._worker_loop,
+                args=(session, self.tasks, progress_callback, stop_check),
+                name=f"invoice-worker-{worker_id}",
+                daemon=True,
+            )
+            self.threads.append(thread)
+            thread.start()
+
+    def run(self, groups, total, progress_callback, stop_check, error_callback):
+        """处理全部工作单元，阻塞直到输入处理完毕或被停止；未调用 start() 时先启动工作线程
+
+        Args:
+            groups: 工作单元的可迭代对象，每个单元为 [(记录序号, 记录), ...]
+            total: 记录总数，用于计算进度
+        """
+        self._total = total
+        self._done = 0
+        if self._total == 0:
+            self.shutdown()
+            return
+
+        if not self.threads:
+            self.start(progress_callback, stop_check, min(self.workers, self._total))
+        self.logger.info(f"{len(self.threads)}个并发浏览器会话处理{self._total}条记录")
+
+        self._feed(groups, self.tasks, stop_check)
+        self.shutdown()
+
+        if self._unfed or (not self.tasks.empty() and stop_check()):
+            error_callback("所有浏览器会话均已退出，剩余记录未处理")
+
+    def shutdown(self):
+        """不再投放记录，等待所有工作线程处理完队列并退出"""
+        self._feeding = False
+        for thread in self.threads:
+            thread.join()
+
+    def stop(self):
+        """关闭所有工作线程的浏览器"""
+        for session in self.sessions:
+            session.browser.quit()
+
+    def _feed(self, groups, tasks, stop_check):
+        """把工作单元逐个投入有界队列；停止或所有工作线程退出时提前结束"""
+        try:
+            for items in groups:
+                while stop_check() and self._alive > 0:
+                    try:
+                        tasks.put(items, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+                else:
+                    self._unfed = stop_check()
+                    break
+        finally:
+            self._feeding = False
+
+    def _worker_loop(self, session, tasks, progress_callback, stop_check):
+        worker_name = threading.current_thread().name
+        try:
+            if not session.prepare_browser():
+                self.logger.error(f"[{worker_name}] 浏览器会话启动失败，退出工作线程")
+                return
+
+            while stop_check():
+                try:
+                    items = tasks.get(timeout=0.5)
+                except queue.Empty:
+                    if self._feeding:
+                        continue
+                    break
+                try:
+                    # 组内异常由 process_group 兜底记为处理异常，不会中断工作线程
+                    session.process_group(items)
+                finally:
+                    self._advance(progress_callback, len(items))
+        finally:
+            with self._lock:
+                self._alive -= 1
+            if session.http:
+                session.http.close()
+            session.browser.quit()
+
+    def _advance(self, progress_callback, count):
+        """线程安全地累计完成数并回调进度"""
+        with self._lock:
+            self._done += count
+            progress = min(self._done / self._total * 100, 100)
+            progress_callback(progress, self.processor.progress_text(self._done))
@@ -0,0 +1,140 @@
+import collections
+import tkinter as tk
+from tkinter import ttk
+
+LEVELS = ("DEBUG", "INFO", "SUCCESS", "WARNING", "ERROR", "CRITICAL")
+
+LEVEL_COLORS = {
+    "DEBUG": "#808080",
+    "SUCCESS": "#2e7d32",
+    "WARNING": "#b26a00",
+    "ERROR": "#c62828",
+    "CRITICAL": "#c62828",
+}
+
+LOG_FORMAT = "{time:HH:mm:ss} | {level: <8} | {extra[context]}{message}"
+
+
+class LogView(ttk.Frame):
+    """运行日志面板
+
+    日志sink只把格式化后的行追加到有界缓冲区（任意线程调用、不碰Tk控件），
+    界面线程按固定间隔批量取出并一次性插入文本框；文本框最多保留 max_lines 行，
+    级别筛选通过隐藏对应级别的文本标签实现，不需要重新扫描已有日志。
+    """
+
+    def __init__(self, parent, logger, max_lines=5000, interval=100, level="INFO"):
+        super().__init__(parent)
+        self.logger = logger
+        self.max_lines = max_lines
+        self.interval = interval
+        # 界面来不及刷新时最多积压 max_lines 行，更早的直接丢弃（反正也会被裁掉）
+        self._pending = collections.deque(maxlen=max_lines)
+        self._sink_id = None
+        self._after_id = None
+        self._lines = 0
+
+        toolbar = ttk.Frame(self)
+        toolbar.pack(fill="x", padx=5, pady=(5, 0))
+        ttk.Label(toolbar, text="显示级别:").pack(side="left")
+        self.level_var = tk.StringVar(value=level)
+        level_box = ttk.Combobox(
+            toolbar,
+            textvariable=self.level_var,
+            values=LEVELS,
+            state="readonly",
+            width=10,
+        )
+        level_box.pack(side="left", padx=5)
+        level_box.bind("<<ComboboxSelected>>", lambda event: self._apply_filter())
+        ttk.Button(toolbar, text="清空", command=self.clear).pack(side="left", padx=5)
+
+        self.text = tk.Text(self, wrap="word", state="disabled")
+        self.text.pack(padx=5, pady=5, fill="both", expand=True, side="left")
+        scrollbar = ttk.Scrollbar(self, command=self.text.yview)
+        scrollbar.pack(side="right", fill="y")
+        self.text.config(yscrollcommand=scrollbar.set)
+
+        for name in LEVELS:
+            self.text.tag_configure(name, foreground=LEVEL_COLORS.get(name, ""))
+        self._apply_filter()
+
+    def attach(self):
+        """注册日志sink并开始定时刷新"""
+        if self._sink_id is None:
+            self._sink_id = self.logger.add(
+                self._write, level="DEBUG", format=LOG_FORMAT
+            )
+        if self._after_id is None:
+            self._after_id = self.after(self.interval, self._drain)
+        return self
+
+    def detach(self):
+        if self._sink_id is not None:
+            try:
+                self.logger.remove(self._sink_id)
+            except ValueError:
+                pass
+            self._sink_id = None
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+
+    def destroy(self):
+        self.detach()
+        super().destroy()
+
+    def clear(self):
+        self._pending.clear()
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.configure(state="disabled")
+        self._lines = 0
+
+    def _write(self, message):
+        # 在产生日志的线程中执行：deque.append 是线程安全的
+        self._pending.append((message.record["level"].name, str(message)))
+
+    def _drain(self):
+        self._after_id = None
+        try:
+            self._flush()
+        finally:
+            if self._sink_id is not None:
+                self._after_id = self.after(self.interval, self._drain)
+
+    def _flush(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._pending.popleft())
+            except IndexError:
+                break
+        if not batch:
+            return
+
+        # 仅当用户停留在底部时自动滚动，翻看历史日志时不打断
+        follow = self.text.yview()[1] >= 0.999
+        # 相邻同级别的行合并为一次插入
+        args = []
+        for level, line in batch:
+            if args and args[-1] == (level,):
+                args[-2] += line
+            else:
+                args.extend([line, (level,)])
+        self.text.configure(state="normal")
+        self.text.insert("end", *args)
+        # 带异常堆栈的日志占多行，按换行符计数
+        self._lines += sum(line.count("\n") for _, line in batch)
+        if self._lines > self.max_lines:
+            excess = self._lines - self.max_lines
+            self.text.delete("1.0", f"{excess + 1}.0")
+            self._lines = self.max_lines
+        self.text.configure(state="disabled")
+        if follow:
+            self.text.see("end")
+
+    def _apply_filter(self):
+        threshold = LEVELS.index(self.level_var.get())
+        for index, name in enumerate(LEVELS):
+            self.text.tag_configure(name, elide=index < threshold)
@@ -2,9 +2,17 @@ import os
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
-from src.core.invoice_processor import InvoiceProcessor
+from src.core.events import EventBus, Progress, RecordResult, RunError, StateChanged
+from src.gui.log_view import LogView
 from src.utils.logger import setup_logger
 
+# 与 RunPlanner.POLICIES 对应（此处不导入core，避免界面启动时加载依赖）
+DUPLICATE_POLICIES = {
+    "keep": "逐条处理（保持文件顺序）",
+    "merge": "同合同合为一组（一次搜索处理该合同的所有行）",
+    "reject": "只处理第一条，其余记为错误",
+}
+
 
 class InvoiceApp:
     def __init__(self, root):
@@ -28,8 +36,21 @@ class InvoiceApp:
         # 初始化日志
         self.logger = setup_logger()
 
+        # 处理线程只发布事件，界面线程定时取出后更新控件
+        self.events = EventBus()
+        self.events.subscribe(Progress, lambda e: self.update_progress(e.value, e.text))
+        self.events.subscribe(RecordResult, self.on_record_result)
+        # 运行错误在运行结束时以失败状态统一提示，运行中只显示在进度文本上
+        self.events.subscribe(
+            RunError, lambda e: self.progress_label.config(text=e.message)
+        )
+        self.events.subscribe(StateChanged, self.on_state_changed)
+        self.succeeded = 0
+        self.failed = 0
+
         # 创建界面
         self.create_widgets()
+        self.root.after(50, self.pump_events)
 
     def create_widgets(self):
         # 创建标签页
@@ -104,6 +125,61 @@ class InvoiceApp:
             row=5, column=2, padx=5, pady=5
         )
 
+        ttk.Label(frame, text="并发浏览器数:").grid(
+            row=6, column=0, padx=5, pady=5, sticky="w"
+        )
+        self.workers_var = tk.IntVar(value=1)
+        ttk.Spinbox(frame, from_=1, to=8, textvariable=self.workers_var, width=5).grid(
+            row=6, column=1, padx=5, pady=5, sticky="w"
+        )
+
+        self.http_mode_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            frame,
+            text="HTTP直连提交（接口失败时回退浏览器操作）",
+            variable=self.http_mode_var,
+        ).grid(row=7, column=1, padx=5, pady=5, sticky="w")
+
+        ttk.Label(frame, text="重复合同编号:").grid(
+            row=8, column=0, padx=5, pady=5, sticky="w"
+        )
+        self.duplicate_policy_var = tk.StringVar(value=DUPLICATE_POLICIES["keep"])
+        ttk.Combobox(
+            frame,
+            textvariable=self.duplicate_policy_var,
+            values=list(DUPLICATE_POLICIES.values()),
+            state="readonly",
+            width=40,
+        ).grid(row=8, column=1, padx=5, pady=5, sticky="w")
+
+        self.prefetch_index_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            frame,
+            text="预抓取合同索引（不在合同表中的记录直接判定未找到）",
+            variable=self.prefetch_index_var,
+        ).grid(row=9, column=1, padx=5, pady=5, sticky="w")
+
+        self.resume_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            frame,
+            text="断点续跑（跳过上次运行中已成功提交的记录）",
+            variable=self.resume_var,
+        ).grid(row=10, column=1, padx=5, pady=5, sticky="w")
+
+        self.lean_browser_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            frame,
+            text="精简浏览器（无头模式，屏蔽图片、字体和统计脚本）",
+            variable=self.lean_browser_var,
+        ).grid(row=11, column=1, padx=5, pady=5, sticky="w")
+
+        self.persist_session_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            frame,
+            text="保持登录（缓存登录会话和浏览器数据，重启后跳过登录）",
+            variable=self.persist_session_var,
+        ).grid(row=12, column=1, padx=5, pady=5, sticky="w")
+
         # 按钮区域（省略部分重复代码）
         btn_frame = ttk.Frame(main_tab)
         btn_frame.pack(padx=10, pady=10)
@@ -127,22 +203,16 @@ class InvoiceApp:
         )
         self.progress_label = ttk.Label(progress_frame, text="等待开始...")
         self.progress_label.pack(padx=5, pady=5, anchor="w")
+        self.result_label = ttk.Label(progress_frame, text="")
+        self.result_label.pack(padx=5, pady=5, anchor="w")
 
         # 日志区域
         log_frame = ttk.LabelFrame(log_tab, text="运行日志")
         log_frame.pack(padx=10, pady=10, fill="both", expand=True)
 
-        self.log_text = tk.Text(log_frame, wrap="word", state="disabled")
-        self.log_text.pack(padx=5, pady=5, fill="both", expand=True, side="left")
-
-        scrollbar = ttk.Scrollbar(log_frame, command=self.log_text.yview)
-        scrollbar.pack(side="right", fill="y")
-        self.log_text.config(yscrollcommand=scrollbar.set)
-
-        # # 重定向日志到文本框（使用自定义sink）
-        # text_sink = TextSink(self.log_text)
-        # # 为日志器添加sink处理器
-        # self.logger.addHandler(logging.StreamHandler(text_sink))
+        # 日志经缓冲区批量刷新到文本框，工作线程不直接操作界面控件
+        self.log_view = LogView(log_frame, self.logger).attach()
+        self.log_view.pack(fill="both", expand=True)
 
     # 以下方法与原代码相同，省略部分重复代码
     def browse_excel(self):
@@ -183,8 +253,14 @@ class InvoiceApp:
         self.is_running = True
         self.start_btn.config(state="disabled")
         self.stop_btn.config(state="normal")
+        self.succeeded = self.failed = 0
+        self.result_label.config(text="")
 
         try:
+            # selenium、pandas等依赖较重，开始处理时才导入（启动后已在后台预加载）
+            from src.core.invoice_processor import InvoiceProcessor
+            from src.utils.excel_handler import ExcelHandler
+
             # 初始化处理器
             self.processor = InvoiceProcessor(
                 excel_path=self.excel_path.get(),
@@ -196,15 +272,27 @@ class InvoiceApp:
                 screenshot_dir=self.screenshot_dir.get(),
                 driver_path=self.driver_path.get()
                 or None,  # 如果驱动路径为空，则传递None
+                workers=self.workers_var.get(),
+                http_mode=self.http_mode_var.get(),
+                duplicate_policy=next(
+                    policy
+                    for policy, text in DUPLICATE_POLICIES.items()
+                    if text == self.duplicate_policy_var.get()
+                ),
+                prefetch_index=self.prefetch_index_var.get(),
+                resume=self.resume_var.get(),
+                lean_browser=self.lean_browser_var.get(),
+                persist_session=self.persist_session_var.get(),
             )
 
             # 检查处理器是否初始化成功
             if not self.processor:
                 raise Exception("处理器初始化失败")
+            self.processor.events = self.events
 
-            # 检查数据加载是否成功
-            if not self.processor.load_data():
-                raise Exception("无法加载Excel数据")
+            # 这里只检查文件是否存在，数据在后台与浏览器启动并行读取
+            if not ExcelHandler.file_exists(self.excel_path.get()):
+                raise FileNotFoundError(f"Excel文件不存在: {self.excel_path.get()}")
 
         except Exception as e:
             self.logger.error(f"初始化处理器失败: {e}")
@@ -220,52 +308,86 @@ class InvoiceApp:
 
     def stop_processing(self):
         self.is_running = False
-        self.start_btn.config(state="normal")
-        self.stop_btn.config(state="disabled")
+        self.reset_buttons()
         self.progress_label.config(text="已停止")
 
         # 停止处理器
         if self.processor:
             self.processor.stop()
 
+    def reset_buttons(self):
+        self.start_btn.config(state="normal")
+        self.stop_btn.config(state="disabled")
+
     def process_invoices(self):
+        """在后台线程中运行，只通过事件通道与界面交互"""
         try:
             # 新增检查：确保处理器已正确初始化
             if not self.processor:
                 error_msg = "处理器未正确初始化"
                 self.logger.error(error_msg)
-                self.root.after(0, lambda: self.update_progress(0, error_msg))
-                self.root.after(0, lambda: messagebox.showerror("错误", error_msg))
+                self.events.publish(StateChanged("failed", error_msg))
                 return
 
-            # 处理发票
+            # 处理发票；出现过运行错误（如登录失败）时按失败结束，与命令行的汇总状态一致
+            run_errors = []
+
+            def on_error(message):
+                run_errors.append(message)
+                self.events.error(message)
+
             self.processor.process(
-                progress_callback=self.update_progress,
+                progress_callback=self.events.progress,
                 stop_check=self.is_running_check,
-                error_callback=self.show_error,
+                error_callback=on_error,
             )
 
-            # 处理完成
-            self.logger.success("所有记录处理完毕")
-            self.root.after(0, lambda: self.update_progress(100, "处理完成"))
-            self.root.after(0, lambda: messagebox.showinfo("提示", "所有记录处理完毕"))
+            if run_errors:
+                self.events.publish(
+                    StateChanged("failed", "\n".join(dict.fromkeys(run_errors)))
+                )
+            elif self.is_running:
+                self.logger.success("所有记录处理完毕")
+                self.events.publish(StateChanged("finished", "处理完成"))
+            else:
+                self.events.publish(StateChanged("stopped", "已停止"))
 
         except Exception as e:
             self.logger.error(f"处理过程出错: {e}")
-            self.root.after(0, lambda: self.update_progress(0, f"处理出错: {str(e)}"))
-            self.root.after(
-                0, lambda: messagebox.showerror("错误", f"处理过程出错: {str(e)}")
-            )
-        finally:
-            self.root.after(0, self.stop_processing)
+            self.events.publish(StateChanged("failed", f"处理过程出错: {str(e)}"))
 
     def is_running_check(self):
         return self.is_running
 
+    def pump_events(self):
+        """界面线程定时分发处理线程发布的事件"""
+        try:
+            self.events.dispatch()
+        finally:
+            self.root.after(50, self.pump_events)
+
     def update_progress(self, value, text):
         """更新进度条和进度文本"""
         self.progress_var.set(value)
         self.progress_label.config(text=text)
 
-    def show_error(self, message):
-        self.root.after(0, lambda: messagebox.showerror("错误", message))
+    def on_record_result(self, event):
+        if event.ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        self.result_label.config(
+            text=f"成功 {self.succeeded} 条，失败 {self.failed} 条"
+        )
+
+    def on_state_changed(self, event):
+        self.is_running = False
+        self.reset_buttons()
+        if event.state == "finished":
+            self.update_progress(100, event.text)
+            messagebox.showinfo("提示", "所有记录处理完毕")
+        elif event.state == "failed":
+            self.update_progress(0, event.text)
+            messagebox.showerror("错误", event.text)
+        else:
+            self.progress_label.config(text=event.text)
@@ -1,20 +1,31 @@
+import time
+
+# 启动计时放在所有导入之前，界面可交互时记录总耗时
+STARTED = time.perf_counter()
+
+import os
+import sys
 import tkinter as tk
 
 
 from src.gui.main_window import InvoiceApp
 from src.utils.dotenv_loader import load_env
 from src.utils.logger import setup_logger
+from src.utils.startup import preload, report_startup
 
 logger = setup_logger()
 
 try:
-    env_vars = load_env()
-    logger.info("环境变量：{}".format(env_vars))
+    load_env()
     logger.info("加载环境变量成功")
 except FileNotFoundError as e:
     logger.error("未找到.env文件")
 
 if __name__ == "__main__":
+    # --startup-profile 或 STARTUP_PROFILE=1 时额外输出各模块导入耗时
+    profile = "--startup-profile" in sys.argv or os.getenv("STARTUP_PROFILE") == "1"
     root = tk.Tk()
     app = InvoiceApp(root)
+    root.after_idle(report_startup, logger, STARTED, profile)
+    root.after(300, preload, logger)
     root.mainloop()
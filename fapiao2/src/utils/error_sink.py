@@ -0,0 +1,92 @@
+import json
+import os
+import threading
+
+import pandas as pd
+
+from src.utils.excel_handler import ExcelHandler
+from src.utils.journal import CheckpointJournal
+
+
+class ErrorSink:
+    """错误记录缓冲区
+
+    运行期间每条错误记录只追加一行到预写文件（JSONL），
+    结束或停止时一次性合并生成错误记录Excel。
+    同一合同可能有多行记录（重复合同拒绝、批量申请中失败的行），本次运行的记录全部保留；
+    已有文件中与本次记录 合同编号+开票项目+开票金额 相同的旧行被替换。
+    """
+
+    def __init__(self, error_file, logger):
+        self.error_file = error_file
+        self.logger = logger
+        base, _ = os.path.splitext(error_file)
+        self.pending_path = f"{base}_pending.jsonl"
+        self.count = 0
+        # 最近一次合并实际写入Excel的记录数
+        self.written = 0
+        self._lock = threading.Lock()
+        self._file = None
+
+    def open(self):
+        """打开预写文件；上次运行异常退出残留的记录先合并到Excel"""
+        if os.path.exists(self.pending_path):
+            self.logger.warning("发现上次运行未合并的错误记录，先写入错误记录文件")
+            self.flush()
+        os.makedirs(os.path.dirname(os.path.abspath(self.pending_path)), exist_ok=True)
+        self._file = open(self.pending_path, "a", encoding="utf-8")
+
+    def append(self, row):
+        line = json.dumps(row, ensure_ascii=False, default=str)
+        with self._lock:
+            if not self._file:
+                self._file = open(self.pending_path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.count += 1
+
+    def close(self):
+        """关闭预写文件并生成错误记录Excel"""
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+            self.flush()
+
+    def flush(self):
+        """将预写文件中的记录合并进错误记录Excel"""
+        if not os.path.exists(self.pending_path):
+            return
+        records = []
+        with open(self.pending_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        try:
+            if records:
+                ExcelHandler.save_error_records(
+                    self._merge(records), self.error_file, append=False
+                )
+            self.written = len(records)
+            os.remove(self.pending_path)
+        except Exception as e:
+            # 保留预写文件，下次运行时再合并
+            self.logger.error(f"生成错误记录文件失败：{e}")
+
+    def _merge(self, records):
+        """已有错误记录中被本次记录取代的行（同一开票记录键）去掉，其余保留在前"""
+        if not os.path.exists(self.error_file):
+            return records
+        existing = pd.read_excel(
+            self.error_file, dtype={"合同编号": str, "开票项目": str}
+        )
+        existing = existing.astype(object).where(existing.notna(), None)
+        keys = {CheckpointJournal.record_key(record) for record in records}
+        kept = [
+            row
+            for row in existing.to_dict("records")
+            if CheckpointJournal.record_key(row) not in keys
+        ]
+        return kept + records
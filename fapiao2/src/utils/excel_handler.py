@@ -1,5 +1,9 @@
 import os
 import pandas as pd
+from openpyxl import load_workbook
+
+# 发票处理只需要这几列
+RECORD_COLUMNS = ("合同编号", "开票项目", "开票金额")
 
 
 class ExcelHandler:
@@ -9,10 +13,75 @@ class ExcelHandler:
         return os.path.exists(file_path)
 
     @staticmethod
-    def read_excel(file_path):
-        """读取Excel文件并返回字典列表"""
-        df = pd.read_excel(file_path)
-        return df.to_dict("records")
+    def count_rows(file_path):
+        """返回数据行数（不含表头），与 iter_records 使用相同的过滤规则
+
+        只带格式、所需列全为空的行不计数，否则进度和汇总中的总数会偏大。
+        """
+        return sum(1 for _ in ExcelHandler.iter_records(file_path))
+
+    @staticmethod
+    def iter_records(file_path, columns=RECORD_COLUMNS):
+        """流式读取Excel，只逐行产出所需列的精简记录
+
+        xlsx使用openpyxl只读模式按行迭代，内存占用与行数无关；
+        xls格式openpyxl不支持，退回pandas按列读取。
+        """
+        if file_path.lower().endswith(".xls"):
+            df = pd.read_excel(file_path, usecols=lambda c: c in columns)
+            for row in df.itertuples(index=False):
+                values = dict(zip(df.columns, row))
+                record = {
+                    col: None if pd.isna(values.get(col)) else values.get(col)
+                    for col in columns
+                }
+                if all(value is None for value in record.values()):
+                    continue
+                yield ExcelHandler._normalize_record(record)
+            return
+
+        wb = load_workbook(file_path, read_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            positions = {col: header.index(col) for col in columns if col in header}
+            for row in rows:
+                record = {
+                    col: (
+                        row[positions[col]]
+                        if col in positions and positions[col] < len(row)
+                        else None
+                    )
+                    for col in columns
+                }
+                if all(value is None for value in record.values()):
+                    continue
+                yield ExcelHandler._normalize_record(record)
+        finally:
+            wb.close()
+
+    @staticmethod
+    def _normalize_record(record):
+        """统一字段类型：合同编号/开票项目为去空白的字符串，开票金额为数值"""
+        for col in ("合同编号", "开票项目"):
+            value = record.get(col)
+            if isinstance(value, float) and value.is_integer():
+                value = int(value)
+            record[col] = str(value).strip() if value is not None else None
+            if record[col] == "":
+                record[col] = None
+        amount = record.get("开票金额")
+        if isinstance(amount, str):
+            try:
+                amount = float(amount.strip().replace(",", ""))
+            except ValueError:
+                pass
+        if isinstance(amount, float) and amount.is_integer():
+            amount = int(amount)
+        record["开票金额"] = amount
+        return record
 
     @staticmethod
     def save_error_records(records, file_path, append=True):
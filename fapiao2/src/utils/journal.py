@@ -0,0 +1,94 @@
+import json
+import os
+import threading
+import time
+
+
+class CheckpointJournal:
+    """只追加的断点日志（JSONL），每条记录到达终态时写入并fsync，崩溃后可据此续跑"""
+
+    SUCCESS = "success"
+    FAILED = "failed"
+
+    def __init__(self, path, logger):
+        self.path = path
+        self.logger = logger
+        self.states = {}
+        self._lock = threading.Lock()
+        self._file = None
+
+    @staticmethod
+    def path_for(error_file):
+        """断点日志与错误记录文件放在同一目录"""
+        base, _ = os.path.splitext(error_file)
+        return f"{base}_journal.jsonl"
+
+    @staticmethod
+    def record_key(record):
+        """同一合同可能有多行开票记录，以 合同编号+开票项目+开票金额 区分"""
+        amount = record.get("开票金额")
+        try:
+            amount = f"{float(amount):.2f}"
+        except (TypeError, ValueError):
+            amount = str(amount)
+        return "|".join(
+            [
+                str(record.get("合同编号") or "").strip(),
+                str(record.get("开票项目") or "").strip(),
+                amount,
+            ]
+        )
+
+    def open(self, resume=False):
+        """打开日志；续跑时先读取已有状态，否则将旧日志改名备份后重新开始"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        if resume:
+            self.states = self._read()
+            self.logger.info(f"已读取断点日志：{len(self.states)}条记录的终态")
+        elif os.path.exists(self.path):
+            os.replace(self.path, self.path + ".bak")
+        self._file = open(self.path, "a", encoding="utf-8")
+        if self._file.tell() > 0:
+            # 补齐崩溃时未写完的最后一行，避免与新记录粘连
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+
+    def is_done(self, record):
+        return self.states.get(self.record_key(record)) == self.SUCCESS
+
+    def mark(self, record, status, reason=""):
+        """写入一条终态记录并落盘"""
+        if not self._file:
+            return
+        key = self.record_key(record)
+        line = json.dumps(
+            {"key": key, "status": status, "reason": reason, "time": time.time()},
+            ensure_ascii=False,
+        )
+        with self._lock:
+            self.states[key] = status
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def _read(self):
+        states = {}
+        if not os.path.exists(self.path):
+            return states
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 崩溃时可能留下写了一半的最后一行，跳过即可
+                    continue
+                states[entry["key"]] = entry["status"]
+        return states
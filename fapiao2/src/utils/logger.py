@@ -1,65 +1,91 @@
 import os
-import time
+import sys
+import threading
 from loguru import logger
-from typing import Optional
-from selenium.webdriver.remote.webdriver import WebDriver
+
+# 单条日志消息的长度上限，超出部分截断，避免误把整批数据写进日志
+MAX_MESSAGE_LENGTH = 2000
+
+# 已注册的日志输出，按名称去重：setup_logger 被多处调用时不会重复添加
+_sinks = {}
+_sinks_lock = threading.Lock()
+
+CONSOLE_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | "
+    "{extra[context]}<level>{message}</level>"
+)
+FILE_FORMAT = (
+    "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} | "
+    "{extra[context]}{message}"
+)
+
+
+def _patch_record(record):
+    """截断超长消息，并把按记录绑定的上下文（工作线程、合同编号、步骤）拼成前缀"""
+    message = record["message"]
+    if len(message) > MAX_MESSAGE_LENGTH:
+        record["message"] = (
+            f"{message[:MAX_MESSAGE_LENGTH]}…（已截断，共{len(message)}字符）"
+        )
+
+    extra = record["extra"]
+    contract = extra.get("contract")
+    if contract:
+        step = extra.get("step")
+        extra["context"] = (
+            f"[w{extra.get('worker', 0)} {contract}{'/' + step if step else ''}] "
+        )
+    else:
+        extra["context"] = ""
+
+
+def _add_sink(name, sink, **kwargs):
+    """按名称注册日志输出，已注册时直接返回原有的handler id"""
+    with _sinks_lock:
+        if name not in _sinks:
+            _sinks[name] = logger.add(sink, **kwargs)
+        return _sinks[name]
+
 
 def setup_logger():
-    """配置日志，保存到与src同级的logs文件夹"""
+    """配置日志，保存到与src同级的logs文件夹（可重复调用）
+
+    所有输出都通过 enqueue=True 交给后台线程写入，处理线程不会因磁盘或控制台I/O阻塞。
+    """
     # 获取当前文件路径（src/utils/logger.py）
     current_path = os.path.abspath(__file__)
     # 计算项目根目录（src的父目录）
     root_dir = os.path.dirname(os.path.dirname(current_path))
     # 定义logs文件夹路径
     logs_dir = os.path.join(root_dir, "logs")
-    
+
     # 确保logs文件夹存在，不存在则创建
     os.makedirs(logs_dir, exist_ok=True)
-    
-    # 日志文件路径
-    log_path = os.path.join(logs_dir, "error.log")
-    
-    logger.add(
-        log_path,
+
+    with _sinks_lock:
+        if "console" not in _sinks:
+            logger.configure(patcher=_patch_record, extra={"context": ""})
+            # 替换loguru默认的同步控制台输出
+            try:
+                logger.remove(0)
+            except ValueError:
+                pass
+            # 打包为无控制台的程序时没有stderr
+            _sinks["console"] = (
+                logger.add(sys.stderr, format=CONSOLE_FORMAT, enqueue=True)
+                if sys.stderr is not None
+                else None
+            )
+
+    _add_sink(
+        "error_file",
+        os.path.join(logs_dir, "error.log"),
         level="ERROR",
+        format=FILE_FORMAT,
         rotation="1 day",  # 每天轮转
         retention="30 days",  # 保留30天
-        encoding="utf-8"
+        encoding="utf-8",
+        enqueue=True,
     )
-    
-    return logger
 
-def capture_screenshot(driver: WebDriver, contract_no: str, root_dir: Optional[str] = None) -> str:
-    """
-    捕获浏览器截图并以合同号命名保存
-    
-    Args:
-        driver: Selenium浏览器驱动
-        contract_no: 合同编号
-        root_dir: 根目录，默认为项目根目录
-        
-    Returns:
-        截图保存路径
-    """
-    try:
-        if not root_dir:
-            # 计算项目根目录
-            current_path = os.path.abspath(__file__)
-            root_dir = os.path.dirname(os.path.dirname(current_path))
-            
-        # 定义截图保存目录（使用传入的root_dir作为基础路径）
-        screenshots_dir = root_dir
-        os.makedirs(screenshots_dir, exist_ok=True)
-        
-        # 生成截图文件名（合同号+时间戳避免重复）
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        filename = f"{contract_no}_{timestamp}.png"
-        file_path = os.path.join(screenshots_dir, filename)
-        
-        # 保存截图
-        driver.save_screenshot(file_path)
-        logger.info(f"已保存错误截图: {file_path}")
-        return file_path
-    except Exception as e:
-        logger.error(f"截图保存失败: {e}")
-        return ""
\ No newline at end of file
+    return logger
@@ -0,0 +1,141 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+
+
+def _percentile(sorted_values, q):
+    """最近秩法求百分位数，sorted_values 需已升序排列"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class RunMetrics:
+    """单次运行的步骤耗时采集器
+
+    每个步骤（登录、导航、搜索、申请、各表单项、提交、截图、写错误记录等）
+    结束时追加一行JSONL，运行结束后汇总每个步骤的 p50/p95/max 和每分钟处理记录数。
+    """
+
+    def __init__(self, logger, path=None):
+        self.logger = logger
+        self.path = path or self.default_path()
+        self.samples = defaultdict(list)
+        self.failures = defaultdict(int)
+        self.counters = defaultdict(int)
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._file = None
+
+    @staticmethod
+    def default_path():
+        """保存到与src同级的logs文件夹，每次运行一个文件"""
+        current_path = os.path.abspath(__file__)
+        root_dir = os.path.dirname(os.path.dirname(os.path.dirname(current_path)))
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        return os.path.join(root_dir, "logs", f"metrics_{timestamp}.jsonl")
+
+    def open(self):
+        self.started_at = time.time()
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        except OSError as e:
+            # 耗时数据只用于分析，写不了文件时仍在内存中汇总
+            self.logger.warning(f"无法写入耗时统计文件：{e}")
+
+    def add(self, step, seconds, ok=True, contract_no="", worker=0):
+        """记录一个步骤的耗时"""
+        line = json.dumps(
+            {
+                "time": round(time.time(), 3),
+                "worker": worker,
+                "contract": str(contract_no or ""),
+                "step": step,
+                "seconds": round(seconds, 4),
+                "ok": ok,
+            },
+            ensure_ascii=False,
+        )
+        with self._lock:
+            self.samples[step].append(seconds)
+            if not ok:
+                self.failures[step] += 1
+            if self._file:
+                self._file.write(line + "\n")
+
+    def count(self, name, n=1):
+        """累加计数器（如重试次数）"""
+        with self._lock:
+            self.counters[name] += n
+
+    def throughput(self, done):
+        """从运行开始到现在的平均处理速度（条/分钟）"""
+        minutes = (time.time() - self.started_at) / 60
+        return done / minutes if minutes > 0 else 0.0
+
+    def summary(self):
+        with self._lock:
+            steps = {}
+            for step, values in self.samples.items():
+                ordered = sorted(values)
+                steps[step] = {
+                    "count": len(ordered),
+                    "failed": self.failures.get(step, 0),
+                    "p50": round(_percentile(ordered, 50), 3),
+                    "p95": round(_percentile(ordered, 95), 3),
+                    "max": round(ordered[-1], 3),
+                    "total": round(sum(ordered), 3),
+                }
+            records = steps.get("record", {}).get("count", 0)
+            elapsed = time.time() - self.started_at
+            return {
+                "elapsed_seconds": round(elapsed, 1),
+                "records": records,
+                "records_per_minute": (
+                    round(records / (elapsed / 60), 2) if elapsed > 0 else 0.0
+                ),
+                "steps": steps,
+                "counters": dict(self.counters),
+            }
+
+    def close(self):
+        """输出汇总报告，并把汇总作为最后一行写入JSONL"""
+        summary = self.summary()
+        if summary["steps"]:
+            lines = [
+                f"{'步骤':<16}{'次数':>6}{'失败':>6}{'p50(s)':>9}{'p95(s)':>9}{'max(s)':>9}"
+            ]
+            for step, stats in sorted(
+                summary["steps"].items(),
+                key=lambda item: item[1]["total"],
+                reverse=True,
+            ):
+                lines.append(
+                    f"{step:<16}{stats['count']:>6}{stats['failed']:>6}"
+                    f"{stats['p50']:>9.3f}{stats['p95']:>9.3f}{stats['max']:>9.3f}"
+                )
+            self.logger.info(
+                f"耗时统计：{summary['records']}条记录，用时{summary['elapsed_seconds']}秒，"
+                f"{summary['records_per_minute']}条/分钟\n" + "\n".join(lines)
+            )
+        if summary["counters"]:
+            self.logger.info(
+                "计数："
+                + "，".join(
+                    f"{name} {value}次"
+                    for name, value in sorted(summary["counters"].items())
+                )
+            )
+        with self._lock:
+            if self._file:
+                self._file.write(
+                    json.dumps({"summary": summary}, ensure_ascii=False) + "\n"
+                )
+                self._file.close()
+                self._file = None
+        return summary
@@ -0,0 +1,117 @@
+import base64
+import itertools
+import os
+import queue
+import threading
+import time
+
+# 按优先级选取截图区域：打开的对话框 → 合同表格；都不可见时截取整个视口
+_JS_CLIP_RECT = """
+var selectors = arguments[0];
+for (var i = 0; i < selectors.length; i++) {
+    var nodes = document.querySelectorAll(selectors[i]);
+    for (var j = 0; j < nodes.length; j++) {
+        var rect = nodes[j].getBoundingClientRect();
+        if (rect.width > 0 && rect.height > 0) {
+            return {
+                x: rect.left + window.scrollX,
+                y: rect.top + window.scrollY,
+                width: rect.width,
+                height: rect.height
+            };
+        }
+    }
+}
+return null;
+"""
+
+DEFAULT_CLIP_SELECTORS = ("div.el-dialog", ".el-table")
+
+
+class ScreenshotService:
+    """错误截图服务
+
+    通过CDP的 Page.captureScreenshot 截取出错区域的JPEG/WebP（体积约为整窗PNG的十分之一），
+    图片数据交给后台线程写盘，调用方拿到文件路径后立即继续处理下一条记录。
+    """
+
+    def __init__(
+        self, logger, root_dir, image_format="jpeg", quality=60, clip_selectors=None
+    ):
+        self.logger = logger
+        self.root_dir = root_dir
+        self.image_format = image_format
+        self.quality = quality
+        self.clip_selectors = list(clip_selectors or DEFAULT_CLIP_SELECTORS)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+
+    def start(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._write_loop, name="screenshot-writer", daemon=True
+            )
+            self._thread.start()
+
+    def close(self):
+        """等待已截取的图片全部写盘"""
+        with self._lock:
+            if not self._thread:
+                return
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def capture(self, driver, name) -> str:
+        """截取当前页面出错区域并异步保存，返回图片路径；失败返回空字符串"""
+        try:
+            data, extension = self._grab(driver)
+            # 序号避免同一秒内同一合同的多张截图重名
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            sequence = next(self._sequence)
+            file_path = os.path.join(
+                self.root_dir, f"{name}_{timestamp}_{sequence}.{extension}"
+            )
+            if self._thread is None:
+                self._write(file_path, data)
+            else:
+                self._queue.put((file_path, data))
+            return file_path
+        except Exception as e:
+            self.logger.error(f"截图失败: {e}")
+            return ""
+
+    def _grab(self, driver):
+        """返回 (base64图片数据, 扩展名)；非Chromium浏览器退回整窗PNG"""
+        if not hasattr(driver, "execute_cdp_cmd"):
+            return driver.get_screenshot_as_base64(), "png"
+
+        params = {"format": self.image_format, "captureBeyondViewport": False}
+        if self.image_format != "png":
+            params["quality"] = self.quality
+        clip = driver.execute_script(_JS_CLIP_RECT, self.clip_selectors)
+        if clip:
+            params["clip"] = {**clip, "scale": 1}
+        result = driver.execute_cdp_cmd("Page.captureScreenshot", params)
+        extension = "jpg" if self.image_format == "jpeg" else self.image_format
+        return result["data"], extension
+
+    def _write(self, file_path, data):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+            with open(file_path, "wb") as f:
+                f.write(base64.b64decode(data))
+            self.logger.info(f"已保存错误截图: {file_path}")
+        except Exception as e:
+            self.logger.error(f"截图保存失败: {e}")
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            self._write(*item)
@@ -0,0 +1,79 @@
+import importlib
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+
+# 从进程启动到界面可交互的耗时预算（秒）
+STARTUP_BUDGET = 1.0
+
+# 开始处理时才需要的重依赖（selenium、pandas、openpyxl）
+HEAVY_MODULES = ("src.core.invoice_processor", "src.utils.excel_handler")
+
+_IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def preload(logger, modules=HEAVY_MODULES):
+    """界面显示后在后台线程预加载处理所需的模块，点击「开始处理」时无需再等待导入"""
+
+    def _load():
+        start = time.perf_counter()
+        for module in modules:
+            try:
+                importlib.import_module(module)
+            except Exception as e:
+                logger.warning(f"预加载模块{module}失败: {e}")
+        logger.debug(f"后台预加载处理模块耗时{time.perf_counter() - start:.2f}秒")
+
+    threading.Thread(target=_load, name="preload", daemon=True).start()
+
+
+def import_breakdown(module, top=15):
+    """在子进程中以 -X importtime 导入模块，返回累计耗时最长的 top 个 [(模块名, 毫秒)]"""
+    project_root = os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=project_root,
+        timeout=60,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match:
+            rows.append((match.group(4), int(match.group(2)) / 1000))
+    rows.sort(key=lambda row: row[1], reverse=True)
+    return rows[:top]
+
+
+def report_startup(logger, started, profile=False):
+    """记录界面启动耗时，超出预算时警告；profile为True时在后台输出导入耗时明细"""
+    elapsed = time.perf_counter() - started
+    if elapsed > STARTUP_BUDGET:
+        logger.warning(f"界面启动耗时{elapsed:.2f}秒，超出{STARTUP_BUDGET}秒预算")
+    else:
+        logger.info(f"界面启动耗时{elapsed:.2f}秒")
+
+    if not profile:
+        return
+    if getattr(sys, "frozen", False):
+        logger.warning("打包后的程序不支持 -X importtime，请在源码环境下测量启动耗时")
+        return
+
+    def _profile():
+        try:
+            rows = import_breakdown("src.gui.main_window")
+        except Exception as e:
+            logger.warning(f"导入耗时测量失败: {e}")
+            return
+        lines = [f"{'累计(ms)':>10}  模块"] + [
+            f"{ms:>10.1f}  {name}" for name, ms in rows
+        ]
+        logger.info("界面模块导入耗时（-X importtime）：\n" + "\n".join(lines))
+
+    threading.Thread(target=_profile, name="startup-profile", daemon=True).start()